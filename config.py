@@ -1,12 +1,18 @@
 import os
 import json
+import time
+import copy
 import base64
+import threading
 import cryptography
+from functools import lru_cache
+from types import MappingProxyType
 from cryptography.fernet import Fernet
 
 # 1️⃣ **CONFIGURATION FILE PATHS**
 CONFIG_FILE = "config.json"
 ENCRYPTION_KEY_FILE = "encryption.key"
+CONFIG_RELOAD_CHECK_SECONDS = 2.0  # how often readers stat config.json for changes
 
 # 2️⃣ **ENCRYPTION HANDLING**
 def generate_encryption_key():
@@ -23,14 +29,19 @@ def load_encryption_key():
     with open(ENCRYPTION_KEY_FILE, "rb") as f:
         return f.read()
 
+@lru_cache(maxsize=None)
+def get_cipher(key):
+    """Returns the process-wide Fernet cipher for a key (built once, reused for every value)."""
+    return Fernet(key)
+
 def encrypt_value(value, key):
     """Encrypts a given value using Fernet encryption."""
-    return Fernet(key).encrypt(value.encode()).decode() if value else ""
+    return get_cipher(key).encrypt(value.encode()).decode() if value else ""
 
 def decrypt_value(value, key):
     """Decrypts an encrypted value using Fernet encryption."""
     try:
-        return Fernet(key).decrypt(value.encode()).decode() if value else ""
+        return get_cipher(key).decrypt(value.encode()).decode() if value else ""
     except:
         print("❌ Error: Unable to decrypt credentials. Please reconfigure.")
         return None
@@ -48,21 +59,34 @@ DEFAULT_CONFIG = {
     },
     "system": {
         "language": "en",
-        "debug_mode": False
+        "debug_mode": False,
+        "offline": False  # serve datasets only from the local cache (air-gapped nodes)
+    },
+    "scoring_server": {
+        "host": "127.0.0.1",
+        "port": 8765,
+        "batch_window_ms": 5,  # how long the server waits to gather concurrent requests into one batch
+        "max_batch_size": 4096
+    },
+    "blockcypher": {
+        "requests_per_second": 3,  # API plan limits (defaults: free plan with a token)
+        "requests_per_hour": 200,
+        "scan_workers": 8  # concurrent lookups in bulk wallet scans
     }
 }
 
 # 4️⃣ **LOAD CONFIGURATION & DECRYPT API KEYS**
-def load_config():
+def load_config(verbose=True):
     """Loads and decrypts the configuration file."""
-    print("🔍 Loading OSINTEL configuration...")
+    if verbose:
+        print("🔍 Loading OSINTEL configuration...")
 
     encryption_key = load_encryption_key()
 
     if not os.path.exists(CONFIG_FILE):
         print("⚠️ Config file missing! Creating a new one...")
-        save_config(DEFAULT_CONFIG, encryption_key)
-        return DEFAULT_CONFIG
+        save_config(copy.deepcopy(DEFAULT_CONFIG), encryption_key)
+        return copy.deepcopy(DEFAULT_CONFIG)
 
     try:
         with open(CONFIG_FILE, "r") as f:
@@ -73,13 +97,14 @@ def load_config():
             if value:
                 config_data["api_keys"][key] = decrypt_value(value, encryption_key)
 
-        print("✅ Configuration successfully loaded!")
+        if verbose:
+            print("✅ Configuration successfully loaded!")
         return config_data
 
     except (json.JSONDecodeError, KeyError):
         print("❌ Invalid config format! Resetting to default.")
-        save_config(DEFAULT_CONFIG, encryption_key)
-        return DEFAULT_CONFIG
+        save_config(copy.deepcopy(DEFAULT_CONFIG), encryption_key)
+        return copy.deepcopy(DEFAULT_CONFIG)
 
 # 5️⃣ **SAVE CONFIGURATION**
 def save_config(config_data, encryption_key):
@@ -111,25 +136,97 @@ def validate_config(config_data):
     if not missing_required_keys:
         print("✅ All required API keys verified!")
 
-# 7️⃣ **STATIC CREDENTIAL REFERENCE FOR MODULES**
-class OSINTELConfig:
-    """Provides static references to configuration data."""
-    _config_data = load_config()
-
+# 7️⃣ **CACHED, HOT-RELOADABLE CONFIGURATION SNAPSHOT**
+_snapshot = None
+_snapshot_version = None
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+def _freeze(value):
+    """Turns nested dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _files_version():
+    """Identifies the current config.json and encryption key by their modification times."""
+    version = []
+    for path in (CONFIG_FILE, ENCRYPTION_KEY_FILE):
+        try:
+            version.append(os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+def get_config():
+    """Returns the current immutable, decrypted configuration snapshot.
+
+    config.json is decrypted once per process and re-read only when it (or the
+    encryption key) changes. Readers never wait for a reload once a snapshot
+    exists; whoever notices the change reloads while the others keep using the
+    previous snapshot.
+    """
+    global _snapshot, _snapshot_version, _last_check
+
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _last_check < CONFIG_RELOAD_CHECK_SECONDS:
+        return snapshot
+
+    if not _reload_lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        _last_check = time.monotonic()
+        version = _files_version()
+        if _snapshot is None or version != _snapshot_version:
+            _snapshot = _freeze(load_config(verbose=False))
+            _snapshot_version = version
+        return _snapshot
+    finally:
+        _reload_lock.release()
+
+# 8️⃣ **LIVE CREDENTIAL REFERENCE FOR MODULES**
+_CONFIG_ATTRIBUTES = {
     # OPTIONAL CREDENTIALS
-    TELEGRAM_BOT_TOKEN = _config_data["telegram"].get("bot_token", "")
-    TELEGRAM_CHAT_ID = _config_data["telegram"].get("chat_id", "")
+    "TELEGRAM_BOT_TOKEN": ("telegram", "bot_token", ""),
+    "TELEGRAM_CHAT_ID": ("telegram", "chat_id", ""),
 
     # REQUIRED CREDENTIALS
-    BLOCKCYPHER_API_KEY = _config_data["api_keys"].get("blockcypher", None)
-    FACE_RECOGNITION_KEY = _config_data["api_keys"].get("face_recognition", None)
-    NLTK_KEY = _config_data["api_keys"].get("nltk", None)
+    "BLOCKCYPHER_API_KEY": ("api_keys", "blockcypher", None),
+    "FACE_RECOGNITION_KEY": ("api_keys", "face_recognition", None),
+    "NLTK_KEY": ("api_keys", "nltk", None),
 
     # SYSTEM SETTINGS
-    LANGUAGE = _config_data["system"]["language"]
-    DEBUG_MODE = _config_data["system"]["debug_mode"]
+    "LANGUAGE": ("system", "language", "en"),
+    "DEBUG_MODE": ("system", "debug_mode", False),
+    "OFFLINE_MODE": ("system", "offline", False),
+
+    # SCORING SERVER
+    "SCORING_SERVER_HOST": ("scoring_server", "host", "127.0.0.1"),
+    "SCORING_SERVER_PORT": ("scoring_server", "port", 8765),
+    "SCORING_BATCH_WINDOW_MS": ("scoring_server", "batch_window_ms", 5),
+    "SCORING_MAX_BATCH_SIZE": ("scoring_server", "max_batch_size", 4096),
+
+    # BLOCKCYPHER RATE LIMITS
+    "BLOCKCYPHER_REQUESTS_PER_SECOND": ("blockcypher", "requests_per_second", 3),
+    "BLOCKCYPHER_REQUESTS_PER_HOUR": ("blockcypher", "requests_per_hour", 200),
+    "BLOCKCYPHER_SCAN_WORKERS": ("blockcypher", "scan_workers", 8)
+}
+
+class _LiveConfigType(type):
+    """Resolves OSINTELConfig attributes against the current snapshot on every access."""
+
+    def __getattr__(cls, name):
+        if name not in _CONFIG_ATTRIBUTES:
+            raise AttributeError(name)
+        section, key, default = _CONFIG_ATTRIBUTES[name]
+        return get_config().get(section, {}).get(key, default)
+
+class OSINTELConfig(metaclass=_LiveConfigType):
+    """Provides references to configuration data that follow config.json without a restart."""
 
-# 8️⃣ **RUN CONFIGURATION SETUP**
+# 9️⃣ **RUN CONFIGURATION SETUP**
 if __name__ == "__main__":
     config_data = load_config()
     validate_config(config_data)
\ No newline at end of file
@@ -1,11 +1,17 @@
 import os
+import ast
 import importlib
+import importlib.util
 import traceback
-import config
 import json
 import time
 import itertools
 import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from workers import WarmWorkerPool
+from profiler import PROFILER
 
 # UI Colors
 RED = "\033[1;31m"
@@ -37,30 +43,97 @@ def display_banner():
         time.sleep(0.05)
     time.sleep(1)
 
-# 2️⃣ **DYNAMIC MODULE LOADING**
+# 2️⃣ **DYNAMIC MODULE LOADING (LAZY, MANIFEST-DRIVEN)**
+MODULES_DIR = "modules"
+MANIFEST_KEYS = ("description", "requires", "job_args")
+JOB_ARG_TYPES = {"str": str, "int": int, "float": float}
+
 loaded_modules = {}
+module_import_times = {}
+warm_pool = None
+
+def read_module_manifest(path):
+    """Reads a module's manifest (`description`, `requires`, `run`) from its source without importing it."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    manifest = {"has_run": False, "has_run_job": False}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in ("run", "run_job"):
+            manifest[f"has_{node.name}"] = True
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id in MANIFEST_KEYS:
+                try:
+                    manifest[target.id] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return manifest
+
+class LazyModule:
+    """Menu entry for an OSINTEL module that is only imported when it is first used."""
+
+    def __init__(self, name, manifest):
+        self.name = name
+        self.description = manifest["description"]
+        self.requires = manifest.get("requires", [])
+        self.headless = manifest["has_run_job"]
+        self.job_args = manifest.get("job_args", {})
+        self.module = None
+
+    def missing_requirements(self):
+        """Lists required packages that are not installed (checked without importing them)."""
+        return [req for req in self.requires if importlib.util.find_spec(req) is None]
+
+    def load(self):
+        """Imports the module on first use and records its cold-start import time."""
+        if self.module is None:
+            print(f"{CYAN}⏳ Loading module: {self.name}...{RESET}")
+            started = time.perf_counter()
+            with PROFILER.phase(f"import {self.name}", "module_import"):
+                self.module = importlib.import_module(self.name)
+            module_import_times[self.name] = time.perf_counter() - started
+            print(f"{GREEN}✅ Loaded module: {self.name} in {module_import_times[self.name]:.2f}s{RESET}")
+        return self.module
+
+    def run(self, *args, **kwargs):
+        module = self.load()
+        with PROFILER.phase(f"run {self.name}", "module_run"):
+            return module.run(*args, **kwargs)
 
 def load_modules():
-    """Scans the 'modules/' folder and loads all valid OSINTEL modules dynamically."""
+    """Scans the 'modules/' folder and registers all valid OSINTEL modules without importing them."""
     global loaded_modules
     loaded_modules = {}
 
     print(f"{CYAN}🔍 Scanning for available OSINT modules...{RESET}\n")
-    time.sleep(1)
 
-    for filename in os.listdir("modules"):
+    for filename in sorted(os.listdir(MODULES_DIR)):
         if filename.endswith(".py") and filename != "__init__.py":
-            module_name = f"modules.{filename[:-3]}"
+            module_name = f"{MODULES_DIR}.{filename[:-3]}"
             try:
-                module = importlib.import_module(module_name)
-                if hasattr(module, "run") and hasattr(module, "description"):
-                    loaded_modules[module_name] = module
-                    print(f"{GREEN}✅ Loaded module: {module_name} - {module.description}{RESET}")
-                else:
-                    print(f"{YELLOW}⚠️ Skipping module (missing 'run' function or description): {module_name}{RESET}")
-            except Exception as e:
-                print(f"{RED}❌ Failed to load module: {module_name} - {e}{RESET}")
-                traceback.print_exc()
+                manifest = read_module_manifest(os.path.join(MODULES_DIR, filename))
+            except (OSError, SyntaxError) as e:
+                print(f"{RED}❌ Failed to read module: {module_name} - {e}{RESET}")
+                continue
+
+            if manifest["has_run"] and "description" in manifest:
+                entry = LazyModule(module_name, manifest)
+                loaded_modules[module_name] = entry
+                print(f"{GREEN}✅ Registered module: {module_name} - {entry.description}{RESET}")
+                missing = entry.missing_requirements()
+                if missing:
+                    print(f"{YELLOW}⚠️ {module_name} needs missing packages: {', '.join(missing)}{RESET}")
+            elif manifest["has_run"] or "description" in manifest:
+                print(f"{YELLOW}⚠️ Skipping module (missing 'run' function or description): {module_name}{RESET}")
+
+def report_import_times():
+    """Prints per-module import times for the modules loaded in this session."""
+    if not module_import_times:
+        return
+    print(f"{CYAN}⏱️ Module import times:{RESET}")
+    for module_name, seconds in sorted(module_import_times.items(), key=lambda item: -item[1]):
+        print(f"{WHITE}  {module_name}: {seconds:.2f}s{RESET}")
 
 # 3️⃣ **LOADING ANIMATION**
 def loading_animation(message="Processing"):
@@ -75,6 +148,31 @@ def loading_animation(message="Processing"):
     sys.stdout.write("\n")
 
 # 4️⃣ **MODULE EXECUTION MENU**
+def prompt_job_args(entry):
+    """Asks for a module's `job_args` in the menu process; blank answers fall back to the function defaults."""
+    job_args = {}
+    for arg_name, spec in entry.job_args.items():
+        prompt, arg_type = (spec, "str") if isinstance(spec, str) else spec
+        value = input(f"{YELLOW}{prompt}{RESET}").strip()
+        if value:
+            job_args[arg_name] = JOB_ARG_TYPES[arg_type](value)
+    return job_args
+
+def run_in_warm_worker(entry):
+    """Runs a module through its persistent worker so heavy state is only built on the first run."""
+    warm_up_seconds = warm_pool.ensure_worker(entry.name)
+    if warm_up_seconds is not None:
+        print(f"{GREEN}🔥 Warm worker for {entry.name} ready in {warm_up_seconds:.2f}s{RESET}")
+
+    job_args = prompt_job_args(entry)
+    with PROFILER.phase(f"run {entry.name} (warm worker)", "module_run"):
+        response = warm_pool.submit(entry.name, job_args)
+    if response["status"] == "ok":
+        print(f"{GREEN}✅ {entry.description} completed in {response['elapsed_seconds']:.3f}s (warm worker){RESET}")
+    else:
+        print(f"{RED}❌ {entry.description} failed: {response['error']}{RESET}")
+    input(f"\n{YELLOW}Press Enter to return to the menu...{RESET}")
+
 def show_module_menu():
     """Displays the module selection menu and executes the chosen module."""
     while True:
@@ -83,21 +181,34 @@ def show_module_menu():
         print(f"{WHITE}--------------------------------------------------{RESET}")
 
         for i, (module_name, module) in enumerate(loaded_modules.items()):
-            print(f"{GREEN}{i+1}. {module.description}{RESET}")
+            import_time = module_import_times.get(module_name)
+            loaded_note = f" {WHITE}(loaded in {import_time:.2f}s){RESET}" if import_time is not None else ""
+            print(f"{GREEN}{i+1}. {module.description}{RESET}{loaded_note}")
 
         print(f"{RED}Q. Quit OSINTEL{RESET}")
         choice = input(f"\n{YELLOW}Enter choice:{RESET} ").strip().lower()
 
         if choice == "q":
+            report_import_times()
             print(f"{RED}👋 Exiting OSINTEL.{RESET}")
             break
 
         try:
             selected_module = list(loaded_modules.values())[int(choice) - 1]
-            selected_module.run()
         except (IndexError, ValueError):
             print(f"{RED}❌ Invalid choice. Please enter a valid module number.{RESET}")
             time.sleep(1)
+            continue
+
+        try:
+            if warm_pool is not None and selected_module.headless:
+                run_in_warm_worker(selected_module)
+            else:
+                selected_module.run()
+        except Exception as e:
+            print(f"{RED}❌ Module {selected_module.name} failed: {e}{RESET}")
+            traceback.print_exc()
+            input(f"\n{YELLOW}Press Enter to return to the menu...{RESET}")
 
 # 5️⃣ **SYSTEM STARTUP – AUTO-LOAD CORE COMPONENTS**
 def startup():
@@ -110,14 +221,147 @@ def startup():
     for module in essential_modules:
         if module in loaded_modules:
             print(f"{BLUE}🔧 Running startup module: {module}{RESET}")
-            loaded_modules[module].run()
+            with PROFILER.phase(f"startup {module}", "startup"):
+                loaded_modules[module].run()
 
     print(f"{GREEN}✅ All core components are ready.{RESET}\n")
     time.sleep(1)
 
-# 6️⃣ **MAIN EXECUTION**
-if __name__ == "__main__":
-    display_banner()
+# 6️⃣ **HEADLESS BATCH MODE**
+def load_jobs(job_file):
+    """Loads batch jobs from a JSON list or a JSON-lines file of {"module", "args", "id"} objects.
+
+    Malformed jobs are kept with an "error" so the batch reports them instead of failing.
+    """
+    with open(job_file, "r") as f:
+        content = f.read().strip()
+
+    if content.startswith("["):
+        jobs = json.loads(content)
+    else:
+        jobs = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            jobs[i] = {"id": i + 1, "module": None, "args": {}, "error": f"Job must be a JSON object, got {job!r}"}
+            continue
+        job.setdefault("id", i + 1)
+        job.setdefault("args", {})
+        if not isinstance(job.get("module"), str) or not job["module"]:
+            job["error"] = f"Job 'module' must be a module name, got {job.get('module')!r}"
+        elif not isinstance(job["args"], dict):
+            job["error"] = f"Job 'args' must be a JSON object, got {job['args']!r}"
+        elif not job["module"].startswith(f"{MODULES_DIR}."):
+            job["module"] = f"{MODULES_DIR}.{job['module']}"
+    return jobs
+
+def execute_job(job):
+    """Runs a single batch job in a worker process and returns a machine-readable result."""
+    started = time.perf_counter()
+    result = {"id": job["id"], "module": job["module"], "args": job["args"]}
+    try:
+        module = importlib.import_module(job["module"])
+        result["result"] = module.run_job(**job["args"])
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+def _json_default(value):
+    """Serialises numpy scalars/arrays and other non-JSON values in batch results."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+def run_batch(job_file, output_file, workers=None):
+    """Runs jobs concurrently in a bounded process pool and streams results as JSON lines."""
+    jobs = load_jobs(job_file)
     load_modules()
-    startup()
-    show_module_menu()
+
+    runnable = []
+    with open(output_file, "w") as out:
+        for job in jobs:
+            entry = loaded_modules.get(job["module"]) if "error" not in job else None
+            if entry is None or not entry.headless:
+                error = {"id": job["id"], "module": job["module"], "args": job["args"], "status": "error",
+                         "error": job.get("error", "Module not found or has no run_job() entry point for batch mode")}
+                out.write(json.dumps(error, default=_json_default) + "\n")
+                print(f"{RED}❌ Job {job['id']} rejected: {error['error']}{RESET}")
+            else:
+                runnable.append(job)
+
+        print(f"{CYAN}🚀 Running {len(runnable)} of {len(jobs)} jobs with {workers or os.cpu_count()} workers...{RESET}")
+        failed = len(jobs) - len(runnable)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(execute_job, job): job for job in runnable}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:  # a worker died (e.g. killed by the OOM killer)
+                    job = futures[future]
+                    result = {"id": job["id"], "module": job["module"], "args": job["args"], "status": "error",
+                              "error": f"BrokenProcessPool: {e}"}
+                out.write(json.dumps(result, default=_json_default) + "\n")
+                out.flush()
+                if result["status"] == "ok":
+                    print(f"{GREEN}✅ Job {result['id']} ({result['module']}) finished in {result['elapsed_seconds']}s{RESET}")
+                else:
+                    failed += 1
+                    print(f"{RED}❌ Job {result['id']} ({result['module']}) failed: {result['error']}{RESET}")
+
+    print(f"{CYAN}📄 Batch results written to {output_file} ({failed} failed){RESET}")
+    return failed
+
+def parse_args(argv=None):
+    """Parses OSINTEL command-line options."""
+    parser = argparse.ArgumentParser(description="OSINTEL - AI-Driven OSINT & Cybercrime Intelligence Toolkit")
+    parser.add_argument("--batch", metavar="JOB_FILE", help="run jobs from a JSON/JSON-lines file without the interactive menu")
+    parser.add_argument("--output", default="batch_results.jsonl", help="where batch mode writes its JSON-lines results")
+    parser.add_argument("--workers", type=int, default=None, help="maximum number of concurrent batch worker processes")
+    parser.add_argument("--warm", action="store_true", help="run menu modules in persistent worker processes that keep models loaded")
+    parser.add_argument("--profile", metavar="TRACE_FILE", help="record per-phase wall time, peak RSS and imports as a Chrome trace JSON")
+    return parser.parse_args(argv)
+
+# 7️⃣ **MAIN EXECUTION**
+def main(args):
+    """Runs OSINTEL in batch or interactive mode."""
+    global warm_pool
+
+    with PROFILER.phase("config.OSINTELConfig", "startup"):
+        import config
+        config.get_config()
+
+    if args.batch:
+        with PROFILER.phase("batch", "batch"):
+            return 1 if run_batch(args.batch, args.output, args.workers) else 0
+
+    if args.warm:
+        warm_pool = WarmWorkerPool()
+
+    with PROFILER.phase("display_banner", "startup"):
+        display_banner()
+    with PROFILER.phase("load_modules", "startup"):
+        load_modules()
+    with PROFILER.phase("startup", "startup"):
+        startup()
+    try:
+        show_module_menu()
+    finally:
+        if warm_pool is not None:
+            warm_pool.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile:
+        PROFILER.enable()
+    try:
+        exit_code = main(args)
+    finally:
+        if args.profile:
+            PROFILER.disable()
+            PROFILER.write_trace(args.profile)
+    sys.exit(exit_code)
@@ -73,7 +73,7 @@ sleep 1
 # 4️⃣ **INSTALL REQUIRED PYTHON LIBRARIES WITH FIXED PROGRESS BAR & SUB-BAR**
 echo -e "${YELLOW}\n📦 Installing required Python libraries...${NC}"
 
-REQUIRED_LIBS=("cryptography" "instaloader" "requests" "telegram" "nltk" "web3" "blockcypher" "scikit-learn" "pandas" "matplotlib" "flask" "seaborn" "tensorflow" "torch" "reportlab" "opencv-python" "joblib" "beautifulsoup4" "face_recognition")
+REQUIRED_LIBS=("cryptography" "instaloader" "requests" "telegram" "nltk" "web3" "blockcypher" "scikit-learn" "pandas" "pyarrow" "matplotlib" "flask" "seaborn" "tensorflow" "torch" "reportlab" "opencv-python" "joblib" "beautifulsoup4" "face_recognition")
 
 total_packages=${#REQUIRED_LIBS[@]}
 current_package=0
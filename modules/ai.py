@@ -1,33 +1,48 @@
 import os
 import json
+import time
+import shutil
+import hashlib
+import tempfile
+import multiprocessing
 import joblib
 import config
 import numpy as np
 import pandas as pd
-import requests
 import threading
-import tensorflow as tf
-import xgboost as xgb
-import lightgbm as lgb
-import catboost as cat
-import torch
-import transformers
+import pyarrow.parquet as pq
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threadpoolctl import threadpool_limits
 from datetime import datetime
 from reportlab.pdfgen import canvas
 from sklearn.ensemble import RandomForestClassifier, IsolationForest
 from sklearn.preprocessing import StandardScaler
+from modules import dataset_cache
+from modules import inference
+from modules import secure_store
 from cryptography.fernet import Fernet
-from concurrent.futures import ThreadPoolExecutor
-from multiprocessing import Process, Queue
+from profiler import peak_rss_kb
+
+# Module manifest (read by core.py without importing this module)
+description = "AI Cybercrime Detection"
+requires = ["numpy", "pandas", "pyarrow", "sklearn", "threadpoolctl", "joblib", "tensorflow", "xgboost", "lightgbm", "catboost"]
+job_args = {
+    "risk_score": ["Risk score: ", "float"],
+    "num_transactions": ["Number of transactions: ", "int"],
+    "num_blackmarket_mentions": ["Number of black-market mentions: ", "int"]
+}
 
 # 1️⃣ **SECURE AI MODEL STORAGE & ENCRYPTION**
 MODEL_DIR = "models/"
-MODEL_FILE = f"{MODEL_DIR}cybercrime_ai_model.pkl"
+MODEL_STORE_DIR = f"{MODEL_DIR}cybercrime/"  # one v0001/, v0002/, ... directory per trained version
+LATEST_VERSION_FILE = f"{MODEL_STORE_DIR}LATEST"
+MANIFEST_FILE = "manifest.enc"
 ENCRYPTION_KEY_FILE = f"{MODEL_DIR}encryption.key"
 DATASET_CONFIG_FILE = "models/datasets.json"
 
 # Ensure directories exist
-os.makedirs(MODEL_DIR, exist_ok=True)
+os.makedirs(MODEL_STORE_DIR, exist_ok=True)
 
 # Encryption Key Handling
 def generate_encryption_key():
@@ -48,17 +63,21 @@ ENCRYPTION_KEY = load_encryption_key()
 
 def encrypt_model(model_data):
     """Encrypts an AI model using Fernet encryption."""
-    return Fernet(ENCRYPTION_KEY).encrypt(model_data).decode()
+    return config.get_cipher(ENCRYPTION_KEY).encrypt(model_data).decode()
 
 def decrypt_model(model_data):
     """Decrypts an AI model using Fernet encryption."""
     try:
-        return Fernet(ENCRYPTION_KEY).decrypt(model_data.encode())
+        return config.get_cipher(ENCRYPTION_KEY).decrypt(model_data.encode())
     except:
         print("❌ AI Model Corrupted! Retraining...")
         return None
 
 # 2️⃣ **DYNAMIC DATASET LOADING**
+FEATURE_COLUMNS = ["risk_score", "num_transactions", "num_blackmarket_mentions"]
+LABEL_COLUMN = "is_criminal"
+INGEST_CHUNK_ROWS = 100_000  # rows per CSV chunk; bounds ingestion memory per source
+
 def load_datasets(category):
     """Loads dataset configurations dynamically from datasets.json based on category."""
     if not os.path.exists(DATASET_CONFIG_FILE):
@@ -70,118 +89,860 @@ def load_datasets(category):
 
     return datasets.get(category, [])
 
-def fetch_and_combine_datasets(category):
-    """Fetches datasets from multiple sources dynamically and combines them efficiently."""
+def iter_dataset_chunks(dataset, chunk_rows=INGEST_CHUNK_ROWS, skip_rows=0):
+    """Yields (features float32, labels int8, source rows) chunks from one source, reading only the training columns.
+
+    Remote sources are read from the local columnar cache, which only re-downloads
+    changed data; local sources are read in their declared format (CSV or JSON).
+    The first `skip_rows` source rows (already trained on) are skipped; whole
+    Parquet row groups are skipped without being read.
+    """
+    if dataset["format"] not in ("csv", "api"):
+        raise ValueError(f"unsupported format '{dataset['format']}'")
+    columns = FEATURE_COLUMNS + [LABEL_COLUMN]
+    path = dataset_cache.cached_dataset_path(dataset, numeric_columns=columns)
+
+    if path.endswith((".parquet", ".parquet.enc")):
+        parquet_file = pq.ParquetFile(dataset_cache.open_cached_dataset(path))
+        row_groups = []
+        for i in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(i).num_rows
+            if skip_rows >= group_rows and not row_groups:
+                skip_rows -= group_rows
+            else:
+                row_groups.append(i)
+        batches = parquet_file.iter_batches(batch_size=chunk_rows, columns=columns, row_groups=row_groups)
+        frames = (batch.to_pandas().astype(np.float32) for batch in batches)
+    elif dataset["format"] == "api":  # a local JSON payload (remote ones are cached as Parquet)
+        payload = dataset_cache.read_api_payload(path)[columns].astype(np.float32)
+        frames = (payload.iloc[start:start + chunk_rows] for start in range(0, len(payload), chunk_rows))
+    else:
+        frames = pd.read_csv(path, usecols=columns, dtype=np.float32, chunksize=chunk_rows)
+
+    for frame in frames:
+        if skip_rows:
+            skipped = min(skip_rows, len(frame))
+            frame, skip_rows = frame.iloc[skipped:], skip_rows - skipped
+        source_rows = len(frame)
+        frame = frame.dropna()
+        yield (frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32),
+               frame[LABEL_COLUMN].to_numpy(dtype=np.int8),
+               source_rows)
+
+def stream_training_data(category, data_dir, chunk_rows=INGEST_CHUNK_ROWS, skip_rows=None, scaler=None):
+    """Streams every source of a category to disk and fits the feature scaler on the way.
+
+    Features land in `X.f32` (row-major float32) and labels in `y.i8`, so memory
+    stays bounded by one chunk per source however large the sources are. The
+    features are standardized in place afterwards. `skip_rows` maps source URLs
+    to rows already consumed by a previous version; passing that version's
+    `scaler` keeps it unchanged. Returns (rows, scaler, source rows consumed per URL).
+    """
     dataset_list = load_datasets(category)
-    combined_data = []
-
-    print(f"🔍 Fetching {category.upper()} datasets...")
-
-    def fetch_dataset(dataset):
-        url, dataset_format, dataset_name = dataset["url"], dataset["format"], dataset["name"]
+    skip_rows = skip_rows or {}
+    fit_scaler = scaler is None
+    scaler = StandardScaler() if fit_scaler else scaler
+    source_rows = dict(skip_rows)
+    write_lock = threading.Lock()
+    row_count = 0
+
+    print(f"🔍 Streaming {category.upper()} datasets...")
+
+    def ingest_dataset(dataset, features_file, labels_file):
+        nonlocal row_count
+        url = dataset["url"]
         try:
-            if dataset_format == "csv":
-                df = pd.read_csv(url)
-                combined_data.append(df)
-                print(f"✅ Loaded dataset: {dataset_name}")
-            elif dataset_format == "api":
-                response = requests.get(url)
-                df = pd.json_normalize(response.json())
-                combined_data.append(df)
-                print(f"✅ Fetched API dataset: {dataset_name}")
-            else:
-                print(f"⚠️ Skipping non-CSV dataset: {dataset_name}")
+            rows = 0
+            for features, labels, consumed in iter_dataset_chunks(dataset, chunk_rows, skip_rows.get(url, 0)):
+                with write_lock:
+                    features_file.write(features.tobytes())
+                    labels_file.write(labels.tobytes())
+                    if fit_scaler and len(features):
+                        scaler.partial_fit(features)
+                    row_count += len(features)
+                    source_rows[url] = source_rows.get(url, 0) + consumed
+                rows += len(features)
+            print(f"✅ Loaded dataset: {dataset['name']} ({rows} new rows)")
         except Exception as e:
-            print(f"⚠️ Failed to load dataset {dataset_name}: {str(e)}")
+            print(f"⚠️ Failed to load dataset {dataset['name']}: {str(e)}")
 
     # Multi-threaded dataset fetching for performance
-    threads = []
-    for dataset in dataset_list:
-        thread = threading.Thread(target=fetch_dataset, args=(dataset,))
-        threads.append(thread)
-        thread.start()
-    
-    for thread in threads:
-        thread.join()
-
-    return pd.concat(combined_data) if combined_data else None
-
-# 3️⃣ **TRAIN OR LOAD AI MODEL (FULLY SECURE & PARALLELIZED)**
-def train_new_model():
-    """Trains a new Hybrid AI model using multiple AI techniques with secure updates."""
-    print("🔍 Training AI Cybercrime Detection Model...")
-
-    df_combined = fetch_and_combine_datasets("cybercrime")
-    if df_combined is None:
-        print("❌ No data available to train AI model!")
-        return None
+    with open(os.path.join(data_dir, "X.f32"), "wb") as features_file, \
+            open(os.path.join(data_dir, "y.i8"), "wb") as labels_file:
+        threads = [threading.Thread(target=ingest_dataset, args=(dataset, features_file, labels_file))
+                   for dataset in dataset_list]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # Blobs of sources that changed since they were cached are no longer referenced
+    removed = dataset_cache.prune_dataset_cache()
+    if removed:
+        print(f"✅ Removed {removed} outdated cached dataset(s).")
+
+    if row_count:
+        X = open_training_data(data_dir, row_count, mode="r+")[0]
+        for start in range(0, row_count, chunk_rows):
+            X[start:start + chunk_rows] = scaler.transform(X[start:start + chunk_rows])
+        X.flush()
+    return row_count, scaler, source_rows
+
+def open_training_data(data_dir, row_count, mode="r"):
+    """Memory-maps the streamed training features and labels.
+
+    A memory map alone is not out-of-core: most learners copy their input. See
+    `_fit_member` for how each member reads these files without doing so.
+    """
+    X = np.memmap(os.path.join(data_dir, "X.f32"), dtype=np.float32, mode=mode, shape=(row_count, len(FEATURE_COLUMNS)))
+    y = np.memmap(os.path.join(data_dir, "y.i8"), dtype=np.int8, mode=mode, shape=(row_count,))
+    return X, y
 
-    # Feature Engineering & Standardization
-    features = df_combined[['risk_score', 'num_transactions', 'num_blackmarket_mentions']]
-    labels = df_combined['is_criminal']
-    scaler = StandardScaler()
-    X = scaler.fit_transform(features)
-    y = labels.values
-
-    # Train Multiple AI Models in Parallel
-    models = {
-        "xgboost": xgb.XGBClassifier(use_label_encoder=False, eval_metric='logloss'),
-        "random_forest": RandomForestClassifier(n_estimators=100),
-        "lightgbm": lgb.LGBMClassifier(),
-        "catboost": cat.CatBoostClassifier(verbose=0),
-        "isolation_forest": IsolationForest(n_estimators=100, contamination=0.1),
-        "neural_net": tf.keras.Sequential([
+def fetch_and_combine_datasets(category):
+    """Fetches datasets from multiple sources and combines the training columns into one compact DataFrame."""
+    frames = []
+    for dataset in load_datasets(category):
+        try:
+            for features, labels, _ in iter_dataset_chunks(dataset):
+                frame = pd.DataFrame(features, columns=FEATURE_COLUMNS)
+                frame[LABEL_COLUMN] = labels
+                frames.append(frame)
+        except Exception as e:
+            print(f"⚠️ Failed to load dataset {dataset['name']}: {str(e)}")
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+# 3️⃣ **TRAIN AI MODEL (PROCESS-PARALLEL UNDER A CORE BUDGET)**
+ENSEMBLE_MEMBERS = ["catboost", "xgboost", "lightgbm", "random_forest", "neural_net", "isolation_forest"]  # heaviest first
+TRAINING_CORE_BUDGET = os.cpu_count() or 1
+NEURAL_NET_EPOCHS = 10
+NEURAL_NET_INCREMENTAL_EPOCHS = 3
+FOREST_INCREMENTAL_TREES = 20  # trees added to forests per incremental update
+NEURAL_NET_TOLERANCE = 1e-5  # max |numpy - Keras| output for the numpy export to be used for scoring
+NEURAL_NET_CHECK_ROWS = 4096  # training rows the numpy export is checked against
+NEURAL_NET_BATCH_SIZE = 256
+XGBOOST_BATCH_ROWS = INGEST_CHUNK_ROWS  # rows per batch fed to xgboost's external-memory matrix
+IN_MEMORY_TRAINING_ROWS = 2_000_000  # lightgbm and catboost copy their input; larger data is sampled down to this
+
+def _limit_native_threads(threads):
+    """Caps a training process's native thread pools at `threads`; use as a context manager around the fit.
+
+    numpy and sklearn are already imported (and their BLAS/OpenMP pools sized)
+    when the task runs, so those pools are capped through threadpoolctl; the
+    environment variables cover the frameworks the member imports afterwards.
+    """
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    return threadpool_limits(limits=threads)
+
+def build_member(name, threads):
+    """Builds one untrained ensemble member pinned to `threads` CPU threads."""
+    if name == "xgboost":
+        import xgboost as xgb
+        return xgb.XGBClassifier(eval_metric='logloss', n_jobs=threads)
+    if name == "random_forest":
+        return RandomForestClassifier(n_estimators=100, n_jobs=threads)
+    if name == "lightgbm":
+        import lightgbm as lgb
+        return lgb.LGBMClassifier(n_jobs=threads, verbose=-1)
+    if name == "catboost":
+        import catboost as cat
+        return cat.CatBoostClassifier(verbose=0, thread_count=threads)
+    if name == "isolation_forest":
+        return IsolationForest(n_estimators=100, contamination=0.1, n_jobs=threads)
+    if name == "neural_net":
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        model = tf.keras.Sequential([
+            tf.keras.Input(shape=(len(FEATURE_COLUMNS),)),
             tf.keras.layers.Dense(64, activation='relu'),
             tf.keras.layers.Dense(32, activation='relu'),
             tf.keras.layers.Dense(1, activation='sigmoid')
         ])
+        model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+        return model
+    raise ValueError(f"Unknown ensemble member: {name}")
+
+def plan_thread_budget(members, core_budget):
+    """Splits the core budget so that the members running at the same time never exceed it.
+
+    Returns (concurrent members, {member: threads}); leftover cores go to the heaviest members.
+    """
+    concurrent = max(1, min(len(members), core_budget))
+    threads, leftover = divmod(max(core_budget, concurrent), concurrent)
+    return concurrent, {name: threads + (1 if i < leftover else 0) for i, name in enumerate(members)}
+
+def _in_memory_rows(X, y):
+    """Evenly spaced sample of at most IN_MEMORY_TRAINING_ROWS rows, for members that copy their whole input."""
+    if len(X) <= IN_MEMORY_TRAINING_ROWS:
+        return X, y
+    index = np.linspace(0, len(X) - 1, IN_MEMORY_TRAINING_ROWS).astype(np.int64)
+    return X[index], y[index]
+
+def _fit_xgboost(model, X, y, data_dir, base_model=None):
+    """Trains an XGBClassifier out of core: batches of the memory maps feed an external-memory matrix cached on disk."""
+    import xgboost as xgb
+
+    class TrainingBatches(xgb.DataIter):
+        def __init__(self, cache_dir):
+            self._start = 0
+            super().__init__(cache_prefix=os.path.join(cache_dir, "xgb"))
+
+        def next(self, input_data):
+            if self._start >= len(X):
+                return False
+            end = self._start + XGBOOST_BATCH_ROWS
+            input_data(data=np.asarray(X[self._start:end]), label=np.asarray(y[self._start:end]))
+            self._start = end
+            return True
+
+        def reset(self):
+            self._start = 0
+
+    with tempfile.TemporaryDirectory(dir=data_dir) as cache_dir:
+        batches = TrainingBatches(cache_dir)
+        # ExtMemQuantileDMatrix is xgboost >= 3.0; older versions page an iterator-built DMatrix instead
+        dtrain = xgb.ExtMemQuantileDMatrix(batches) if hasattr(xgb, "ExtMemQuantileDMatrix") else xgb.DMatrix(batches)
+        booster = xgb.train(model.get_xgb_params(), dtrain, num_boost_round=model.get_num_boosting_rounds(),
+                            xgb_model=base_model.get_booster() if base_model is not None else None)
+        del dtrain  # releases the cache pages before the directory is removed
+    model.load_model(bytearray(booster.save_raw(raw_format="json")))
+    return model
+
+def _training_batches(X, y):
+    """Keras batches read from the memory maps one at a time (shuffled in batch order each epoch)."""
+    import tensorflow as tf
+
+    class TrainingBatches(tf.keras.utils.Sequence):
+        def __len__(self):
+            return -(-len(X) // NEURAL_NET_BATCH_SIZE)
+
+        def __getitem__(self, index):
+            rows = slice(index * NEURAL_NET_BATCH_SIZE, (index + 1) * NEURAL_NET_BATCH_SIZE)
+            return np.asarray(X[rows]), np.asarray(y[rows], dtype=np.float32)
+
+    return TrainingBatches()
+
+def _continue_member(name, base_model, threads, X, y, data_dir):
+    """Continues training a previous version's member on new rows only."""
+    if name == "xgboost":
+        return _fit_xgboost(build_member(name, threads), X, y, data_dir, base_model)
+    if name in ("lightgbm", "catboost"):
+        model = build_member(name, threads)
+        X, y = _in_memory_rows(X, y)
+        if name == "lightgbm":
+            model.fit(X, y, init_model=base_model.booster_)
+        else:
+            model.fit(X, y, init_model=base_model)
+        return model
+    if name in ("random_forest", "isolation_forest"):
+        base_model.set_params(warm_start=True, n_jobs=threads,
+                              n_estimators=base_model.n_estimators + FOREST_INCREMENTAL_TREES)
+        return base_model.fit(X) if name == "isolation_forest" else base_model.fit(X, y)
+    if name == "neural_net":
+        base_model.fit(_training_batches(X, y), epochs=NEURAL_NET_INCREMENTAL_EPOCHS, verbose=0)
+        return base_model
+    raise ValueError(f"Unknown ensemble member: {name}")
+
+def _fit_member(name, threads, data_dir, row_count, out_dir, base_dir=None, base_entry=None):
+    """Training-process task: fits (or continues) one member on the memory-mapped data and stores its artifact.
+
+    No member loads the whole training set: xgboost streams it into an
+    external-memory matrix, the neural net reads it batch by batch, and the
+    sklearn forests use the float32 memory map as is (no copy). lightgbm and
+    catboost copy their input, so they train on at most IN_MEMORY_TRAINING_ROWS
+    evenly spaced rows.
+    """
+    X, y = open_training_data(data_dir, row_count)
+
+    started = time.perf_counter()
+    with _limit_native_threads(threads):
+        if base_entry is not None:
+            model = _continue_member(name, _load_artifact(base_dir, base_entry, mmap=False), threads, X, y, data_dir)
+        else:
+            model = build_member(name, threads)
+            if name == "xgboost":
+                model = _fit_xgboost(model, X, y, data_dir)
+            elif name == "isolation_forest":
+                model.fit(X)
+            elif name == "neural_net":
+                model.fit(_training_batches(X, y), epochs=NEURAL_NET_EPOCHS, verbose=0)
+            elif name in ("lightgbm", "catboost"):
+                model.fit(*_in_memory_rows(X, y))
+            else:
+                model.fit(X, y)
+    fit_seconds = time.perf_counter() - started
+
+    return {
+        "member": name,
+        "threads": threads,
+        "fit_seconds": round(fit_seconds, 3),
+        "peak_rss_kb": peak_rss_kb(),
+        "incremental": base_entry is not None,
+        "artifact": _save_artifact(name, model, out_dir, check_rows=X[:NEURAL_NET_CHECK_ROWS])
     }
 
-    with ThreadPoolExecutor() as executor:
-        for model_name, model in models.items():
-            print(f"🔵 Training {model_name}...")
-            executor.submit(model.fit, X, y)
-
-    # Encrypt & Save the Model
-    encrypted_model = encrypt_model(joblib.dumps(models))
-    with open(MODEL_FILE, "wb") as f:
-        f.write(encrypted_model.encode())
+def _fit_member_in_process(*args):
+    # One single-worker pool per member: a fresh spawned process each time (max_tasks_per_child needs Python 3.11)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_fit_member, *args).result()
+
+def train_ensemble(data_dir, row_count, out_dir, members=None, core_budget=None, base_version=None):
+    """Fits ensemble members in separate processes under a global core budget.
+
+    Each member runs in a fresh process (so its peak memory is its own), reads
+    the streamed training data from `data_dir` through memory maps and writes
+    its artifact into `out_dir`. With `base_version`, members present in that
+    version are continued instead of trained from scratch. Returns one report
+    per member; failed members carry an "error" instead of an "artifact" (a
+    training process killed outright, e.g. by the OOM killer, fails its member
+    with BrokenProcessPool instead of hanging the run).
+    """
+    base_dir = _version_dir(base_version) if base_version is not None else None
+    base_members = read_manifest(base_version)["members"] if base_version is not None else {}
+    members = members or ENSEMBLE_MEMBERS
+    concurrent, threads = plan_thread_budget(members, core_budget or TRAINING_CORE_BUDGET)
+
+    print(f"🔵 Training {len(members)} members on {row_count} rows, {concurrent} at a time, "
+          f"within {sum(sorted(threads.values())[-concurrent:])} cores...")
+    reports = []
+    with ThreadPoolExecutor(max_workers=concurrent, thread_name_prefix="osintel-train") as executor:
+        pending = {name: executor.submit(_fit_member_in_process, name, threads[name], data_dir, row_count, out_dir,
+                                         base_dir, base_members.get(name))
+                   for name in members}
+        for name, future in pending.items():
+            try:
+                reports.append(future.result())
+                print(f"✅ Trained {name}")
+            except Exception as e:
+                reports.append({"member": name, "threads": threads[name], "error": f"{type(e).__name__}: {e}"})
+                print(f"❌ Training {name} failed: {e}")
+    return reports
+
+def print_training_report(reports):
+    """Prints per-member training time, thread allocation and peak memory."""
+    print("📊 Training report:")
+    for report in reports:
+        if "error" in report:
+            print(f"   {report['member']:<18} ❌ {report['error']}")
+        else:
+            peak_mb = f"{report['peak_rss_kb'] / 1024:.0f} MB" if report["peak_rss_kb"] is not None else "n/a"
+            print(f"   {report['member']:<18} {report['fit_seconds']:>9.2f}s  {report['threads']:>2} threads  peak RSS {peak_mb}")
+
+def train_new_model(core_budget=None):
+    """Trains a new Hybrid AI model using multiple AI techniques with secure updates."""
+    print("🔍 Training AI Cybercrime Detection Model...")
 
-    print("✅ AI model trained and securely stored.")
-    return models
+    data_dir = tempfile.mkdtemp(dir=MODEL_STORE_DIR, prefix=".train-data-")
+    try:
+        # Stream the projected, downcast training columns to disk (standardized in place)
+        row_count, scaler, source_rows = stream_training_data("cybercrime", data_dir)
+        if not row_count:
+            print("❌ No data available to train AI model!")
+            return None
+
+        # Train every member in its own process and store it as a versioned artifact
+        version, staging_dir = _create_staging_version()
+        reports = train_ensemble(data_dir, row_count, staging_dir, core_budget=core_budget)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    print_training_report(reports)
+
+    trained = {report["member"]: report["artifact"] for report in reports if "artifact" in report}
+    if not trained:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        print("❌ Every ensemble member failed to train!")
+        return None
 
-def load_ai_model():
-    """Loads or initializes an encrypted AI model securely."""
-    if os.path.exists(MODEL_FILE):
-        with open(MODEL_FILE, "rb") as f:
-            encrypted_model_data = f.read()
-        decrypted_model_data = decrypt_model(encrypted_model_data)
-        if decrypted_model_data:
-            return joblib.loads(decrypted_model_data)
+    _commit_version(version, staging_dir, trained, _save_artifact("scaler", scaler, staging_dir),
+                    mode="full", parent=None, source_rows=source_rows,
+                    training_report=reports, training_rows=row_count)
+    print(f"✅ AI model trained and securely stored as version {version}.")
+    return LazyEnsemble(version)
+
+def update_model(core_budget=None):
+    """Incrementally updates the latest version with the source rows added since it was trained.
+
+    Gradient-boosted members continue from their existing boosters, forests
+    grow extra trees on the new rows and the neural net trains a few more
+    epochs. The result is stored as a new version (roll back with
+    `rollback_model`). Members that fail to update are carried over unchanged.
+    """
+    base_version = latest_model_version()
+    if base_version is None:
+        print("⚠️ No trained model to update; running full training instead.")
+        return train_new_model(core_budget)
+
+    base_manifest = read_manifest(base_version)
+    base_dir = _version_dir(base_version)
+    scaler = _load_artifact(base_dir, base_manifest["preprocessor"], mmap=False) if base_manifest.get("preprocessor") else None
+    print(f"🔍 Updating AI model version {base_version} with new data...")
+
+    data_dir = tempfile.mkdtemp(dir=MODEL_STORE_DIR, prefix=".train-data-")
+    try:
+        row_count, scaler, source_rows = stream_training_data(
+            "cybercrime", data_dir, skip_rows=base_manifest.get("source_rows", {}), scaler=scaler)
+        if not row_count:
+            print(f"✅ Version {base_version} is already up to date.")
+            return LazyEnsemble(base_version)
+
+        version, staging_dir = _create_staging_version()
+        members = list(base_manifest["members"])
+        reports = train_ensemble(data_dir, row_count, staging_dir, members=members,
+                                 core_budget=core_budget, base_version=base_version)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    print_training_report(reports)
+
+    updated = {report["member"]: report["artifact"] for report in reports if "artifact" in report}
+    for name in members:
+        if name not in updated:
+            entry = base_manifest["members"][name]
+            for file_name in [entry["file"]] + ([entry["numpy"]["file"]] if entry.get("numpy") else []):
+                shutil.copy2(os.path.join(base_dir, file_name), os.path.join(staging_dir, file_name))
+            updated[name] = entry
+            print(f"⚠️ Carrying {name} over unchanged from version {base_version}.")
+
+    _commit_version(version, staging_dir, updated, _save_artifact("scaler", scaler, staging_dir),
+                    mode="incremental", parent=base_version, source_rows=source_rows,
+                    training_report=reports, training_rows=row_count)
+    print(f"✅ AI model updated on {row_count} new rows and stored as version {version}.")
+    return LazyEnsemble(version)
+
+# 4️⃣ **VERSIONED, LAZILY LOADED MODEL ARTIFACTS**
+def _version_dir(version):
+    return os.path.join(MODEL_STORE_DIR, f"v{version:04d}")
+
+def _file_sha256(path):
+    """Hashes a file in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def list_model_versions():
+    """Lists the stored model versions in ascending order."""
+    if not os.path.isdir(MODEL_STORE_DIR):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(MODEL_STORE_DIR)
+                  if name.startswith("v") and name[1:].isdigit())
+
+def latest_model_version():
+    """Returns the version the LATEST pointer selects (falls back to the newest stored version)."""
+    if os.path.exists(LATEST_VERSION_FILE):
+        with open(LATEST_VERSION_FILE, "r") as f:
+            return int(f.read().strip())
+    versions = list_model_versions()
+    return versions[-1] if versions else None
+
+def set_latest_model_version(version):
+    """Atomically points LATEST at a stored version."""
+    temp_file = f"{LATEST_VERSION_FILE}.tmp"
+    with open(temp_file, "w") as f:
+        f.write(str(version))
+    os.replace(temp_file, LATEST_VERSION_FILE)
+
+ARTIFACT_ENCRYPTION = "osintel-stream-v1"  # secure_store container format of artifacts written now
+
+def _dump_encrypted(obj, path):
+    """Pickles an object straight into an encrypted container, without a plaintext copy on disk."""
+    with secure_store.EncryptedWriter(path, ENCRYPTION_KEY) as f:
+        joblib.dump(obj, f)
+
+def _load_joblib(path, encrypted, mmap):
+    """Loads a joblib artifact; encrypted ones are streamed, or memory-mapped from the one decrypted copy all processes
+    share (where the platform has one)."""
+    if not encrypted:
+        return joblib.load(path, mmap_mode="r" if mmap else None)
+    shared = secure_store.shared_plaintext(path, ENCRYPTION_KEY) if mmap else None
+    if shared is not None:
+        return joblib.load(shared, mmap_mode="r")
+    with secure_store.open_encrypted(path, ENCRYPTION_KEY) as f:
+        return joblib.load(f)
+
+def _export_numpy_weights(name, model, directory, check_rows):
+    """Exports a Keras dense net's weights for numpy scoring, if the numpy forward pass matches Keras."""
+    try:
+        weights = inference.export_mlp(model)
+    except (KeyError, ValueError) as e:
+        print(f"⚠️ {name} cannot be served without TensorFlow: {e}")
+        return None
+    check_rows = np.asarray(check_rows, dtype=np.float32)
+    expected = model.predict(check_rows, batch_size=len(check_rows), verbose=0)[:, 0]
+    max_error = float(np.max(np.abs(inference.mlp_forward(weights, check_rows) - expected)))
+    if max_error > NEURAL_NET_TOLERANCE:
+        print(f"⚠️ Numpy forward pass for {name} is off by {max_error:.2e}; it will be served by TensorFlow.")
+        return None
 
-    return train_new_model()
+    file_name = f"{name}.weights.joblib"
+    _dump_encrypted(weights, os.path.join(directory, file_name))
+    return {"file": file_name, "encryption": ARTIFACT_ENCRYPTION,
+            "sha256": _file_sha256(os.path.join(directory, file_name)), "max_abs_error": max_error}
+
+def _save_artifact(name, obj, directory, check_rows=None):
+    """Writes one ensemble member as an encrypted container; numpy arrays stay uncompressed so they can be memory-mapped.
+
+    Keras members are also exported as plain weight arrays (checked on
+    `check_rows`) so that scoring processes never import TensorFlow.
+    """
+    numpy_export = None
+    if hasattr(obj, "save") and hasattr(obj, "layers"):  # Keras model
+        file_name, artifact_format = f"{name}.keras", "keras"
+        plain_path = os.path.join(directory, f"{name}.plain.keras")
+        obj.save(plain_path)
+        secure_store.encrypt_file(plain_path, os.path.join(directory, file_name), ENCRYPTION_KEY)
+        os.remove(plain_path)
+        if check_rows is not None and len(check_rows):
+            numpy_export = _export_numpy_weights(name, obj, directory, check_rows)
+    else:
+        file_name, artifact_format = f"{name}.joblib", "joblib"
+        _dump_encrypted(obj, os.path.join(directory, file_name))
+    path = os.path.join(directory, file_name)
+    entry = {"file": file_name, "format": artifact_format, "encryption": ARTIFACT_ENCRYPTION,
+             "sha256": _file_sha256(path), "bytes": os.path.getsize(path)}
+    if numpy_export is not None:
+        entry["numpy"] = numpy_export
+    return entry
+
+def _load_artifact(directory, entry, mmap=True):
+    """Verifies and loads one stored artifact, memory-mapping its numpy arrays unless it will be modified.
+
+    Keras members with a numpy export are served from it (no TensorFlow
+    import) unless they will be modified, i.e. trained further.
+    """
+    if mmap and entry.get("numpy"):
+        path = os.path.join(directory, entry["numpy"]["file"])
+        if _file_sha256(path) != entry["numpy"]["sha256"]:
+            raise ValueError(f"Model artifact {path} failed its integrity check")
+        return inference.NumpyMLP(_load_joblib(path, entry["numpy"].get("encryption"), mmap=True))
+    path = os.path.join(directory, entry["file"])
+    if _file_sha256(path) != entry["sha256"]:
+        raise ValueError(f"Model artifact {path} failed its integrity check")
+    if entry["format"] == "keras":
+        import tensorflow as tf
+        if not entry.get("encryption"):
+            return tf.keras.models.load_model(path)
+        plain_path = secure_store.decrypt_to_temp(path, ENCRYPTION_KEY, suffix=".keras")
+        try:
+            return tf.keras.models.load_model(plain_path)
+        finally:
+            os.remove(plain_path)
+    return _load_joblib(path, entry.get("encryption"), mmap)
+
+def write_manifest(directory, manifest):
+    """Writes a version's manifest (member files and digests) encrypted with the model key."""
+    with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+        f.write(encrypt_model(json.dumps(manifest).encode()))
+
+def read_manifest(version):
+    """Reads and authenticates a version's encrypted manifest."""
+    with open(os.path.join(_version_dir(version), MANIFEST_FILE), "r") as f:
+        manifest_data = decrypt_model(f.read())
+    if manifest_data is None:
+        raise ValueError(f"Manifest of model version {version} is corrupted")
+    return json.loads(manifest_data)
+
+def _create_staging_version():
+    """Reserves the next version number and an empty staging directory for it."""
+    versions = list_model_versions()
+    version = versions[-1] + 1 if versions else 1
+    staging_dir = os.path.join(MODEL_STORE_DIR, f".staging-v{version:04d}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    return version, staging_dir
+
+def _commit_version(version, staging_dir, members, preprocessor, **metadata):
+    """Writes the manifest, publishes the staging directory as a version and marks it LATEST."""
+    manifest = {
+        "version": version,
+        "created": datetime.now().isoformat(),
+        "members": members,
+        "preprocessor": preprocessor,
+        **metadata
+    }
+    write_manifest(staging_dir, manifest)
+    os.replace(staging_dir, _version_dir(version))
+    set_latest_model_version(version)
+
+class LazyEnsemble(Mapping):
+    """Read-only mapping of ensemble members that loads each member from disk on first use."""
+
+    def __init__(self, version=None):
+        self._version = version
+        self._manifest = None
+        self._members = {}
+        self._scaler = None
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    if self._version is None:
+                        self._version = latest_model_version()
+                    if self._version is None:
+                        trained = train_new_model()
+                        if trained is None:
+                            raise RuntimeError("No AI model available and training failed")
+                        self._version = trained.version
+                    self._manifest = read_manifest(self._version)
+        return self._manifest
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def scaler(self):
+        """The feature scaler fitted with this version (None for versions stored without one)."""
+        entry = self.manifest.get("preprocessor")
+        if self._scaler is None and entry is not None:
+            self._scaler = _load_artifact(_version_dir(self.version), entry)
+        return self._scaler
+
+    @property
+    def compiled(self):
+        """The version's compiled numpy-only scorer, or None if it has not been compiled."""
+        entry = self.manifest.get("compiled")
+        if self._compiled is None and entry is not None:
+            path = os.path.join(_version_dir(self.version), entry["file"])
+            if _file_sha256(path) != entry["sha256"]:
+                raise ValueError(f"Compiled artifact {path} failed its integrity check")
+            self._compiled = inference.CompiledEnsemble(_load_joblib(path, entry.get("encryption"), mmap=True))
+        return self._compiled
+
+    def __getitem__(self, name):
+        if name not in self._members:
+            entry = self.manifest["members"][name]
+            with self._lock:
+                if name not in self._members:
+                    self._members[name] = _load_artifact(_version_dir(self.version), entry)
+        return self._members[name]
+
+    def __iter__(self):
+        return iter(self.manifest["members"])
+
+    def __len__(self):
+        return len(self.manifest["members"])
+
+def load_ai_model(version=None):
+    """Returns the stored ensemble (latest version by default); nothing is read until a member is used."""
+    return LazyEnsemble(version)
 
 AI_MODELS = load_ai_model()
 
-# 4️⃣ **AI CYBERCRIME RISK ANALYSIS (USING ALL MODELS)**
+def rollback_model(version):
+    """Makes an earlier stored version the active one and reloads `AI_MODELS` from it."""
+    global AI_MODELS
+    if version not in list_model_versions():
+        raise ValueError(f"Model version {version} does not exist")
+    read_manifest(version)  # refuse to activate a corrupted version
+    set_latest_model_version(version)
+    AI_MODELS = load_ai_model()
+    print(f"✅ Rolled back AI model to version {version}.")
+    return AI_MODELS
+
+# 5️⃣ **AI CYBERCRIME RISK ANALYSIS (VECTORIZED OVER ALL MODELS)**
+SCORING_CHUNK_SIZE = 65536  # rows scored per pass; bounds the temporary per-chunk memory
+USE_COMPILED_MODELS = True  # score through the compiled artifact when the version has one
+
+def _feature_matrix(data):
+    """Turns a DataFrame, record dict/list or (n, 3) array into a float32 feature matrix."""
+    if isinstance(data, dict):
+        data = [data]
+    if isinstance(data, list):
+        data = pd.DataFrame(data)
+    if isinstance(data, pd.DataFrame):
+        data = data[FEATURE_COLUMNS].to_numpy()
+    X = np.asarray(data, dtype=np.float32)
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_COLUMNS):
+        raise ValueError(f"Expected an (n, {len(FEATURE_COLUMNS)}) feature matrix, got shape {X.shape}")
+    return X
+
+def _predict_member(model, X):
+    """Runs one ensemble member over a chunk and returns one score per row."""
+    if hasattr(model, "layers"):  # Keras model
+        predictions = model.predict(X, batch_size=len(X), verbose=0)
+    else:
+        predictions = model.predict(X)
+    return np.asarray(predictions, dtype=np.float64).reshape(len(X), -1)[:, 0]
+
+def score_cybercrime_batch(data, chunk_size=SCORING_CHUNK_SIZE, models=None):
+    """Scores many entities at once; every ensemble member runs once per chunk over the whole chunk.
+
+    Uses the version's compiled, pruned artifact when there is one (see
+    `compile_inference_artifact`). Returns {"per_model": {name: array},
+    "aggregate": array} with one score per input row.
+    """
+    models = AI_MODELS if models is None else models
+    X = _feature_matrix(data)
+    compiled = getattr(models, "compiled", None) if USE_COMPILED_MODELS else None
+
+    if compiled is not None:
+        per_model = compiled.predict(X)
+    else:
+        scaler = getattr(models, "scaler", None)
+        member_names = [name for name in models if hasattr(models[name], "predict")]
+        per_model = {name: np.empty(len(X), dtype=np.float64) for name in member_names}
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            if scaler is not None:
+                chunk = scaler.transform(chunk)
+            for name in member_names:
+                per_model[name][start:start + len(chunk)] = _predict_member(models[name], chunk)
+
+    if per_model:
+        aggregate = np.mean(np.vstack(list(per_model.values())), axis=0)
+    else:
+        aggregate = np.zeros(len(X), dtype=np.float64)
+    return {"per_model": per_model, "aggregate": aggregate}
+
 def analyze_cybercrime_risk(data):
     """Uses AI models dynamically to analyze cybercrime risk."""
-    X = np.array([[data['risk_score'], data['num_transactions'], data['num_blackmarket_mentions']]])
-
-    risk_scores = []
-    with ThreadPoolExecutor() as executor:
-        for model_name, model in AI_MODELS.items():
-            if hasattr(model, "predict"):
-                risk_scores.append(executor.submit(model.predict, X).result()[0])
-
-    final_risk_score = sum(risk_scores) / len(risk_scores) if risk_scores else 0
+    final_risk_score = float(score_cybercrime_batch(data)["aggregate"][0])
 
     if final_risk_score > 0.8:
         print("🚨 EXTREME-RISK CYBERCRIME ACTIVITY DETECTED!")
 
     return final_risk_score
 
-# 5️⃣ **RUN AI CYBERCRIME OSINT**
+# 6️⃣ **COMPILED, PRUNED INFERENCE ARTIFACT**
+COMPILED_FILE = "compiled.joblib"
+HOLDOUT_ROWS = 20000
+MAX_ACCURACY_LOSS = 0.005  # ensemble accuracy a pruned member may cost
+COMPILE_TOLERANCE = 1e-4  # allowed disagreement between a compiled member and the original
+PROFILE_WARMUP_ROWS = 256  # rows predicted once before a member's latency is timed
+
+def load_holdout(rows=HOLDOUT_ROWS, category="cybercrime"):
+    """Samples labelled rows (raw, unscaled features) from the training sources for profiling."""
+    df = fetch_and_combine_datasets(category)
+    if df is None:
+        return None
+    df = df.sample(n=min(rows, len(df)), random_state=0)
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float32), df[LABEL_COLUMN].to_numpy()
+
+def _ensemble_accuracy(predictions, names, y):
+    """Accuracy of the averaged ensemble decision (aggregate > 0.5) for a subset of members."""
+    aggregate = np.mean([predictions[name] for name in names], axis=0)
+    return float(np.mean((aggregate > 0.5) == (y == 1)))
+
+def select_members(predictions, latency_us, y, max_accuracy_loss=MAX_ACCURACY_LOSS):
+    """Greedily drops the slowest members while ensemble accuracy stays within `max_accuracy_loss`."""
+    kept = list(predictions)
+    baseline = _ensemble_accuracy(predictions, kept, y)
+    for name in sorted(predictions, key=lambda member: -latency_us[member]):
+        candidate = [member for member in kept if member != name]
+        if candidate and _ensemble_accuracy(predictions, candidate, y) >= baseline - max_accuracy_loss:
+            kept = candidate
+    return kept, baseline
+
+def _compile_member(name, model, X, reference, scratch_dir):
+    """Converts one member and checks that the compiled version reproduces its predictions."""
+    member = inference.convert_member(model, os.path.join(scratch_dir, f"{name}.json"))
+    compiled = inference.predict_member(member, X)
+    if member["kind"] == "mlp":
+        mismatch = float(np.max(np.abs(compiled - reference))) if len(X) else 0.0
+    else:
+        mismatch = float(np.mean(compiled != reference)) if len(X) else 0.0
+    if mismatch > COMPILE_TOLERANCE:
+        raise ValueError(f"compiled {name} disagrees with the original model ({mismatch:.4g})")
+    return member, mismatch
+
+def compile_inference_artifact(version=None, holdout=None, max_accuracy_loss=MAX_ACCURACY_LOSS):
+    """Profiles each member, prunes the ones that do not pay their way and compiles the rest.
+
+    The compiled artifact (plain numpy arrays, see modules/inference.py) is
+    stored with the version and used automatically by `score_cybercrime_batch`,
+    so scoring needs no tensorflow, torch, catboost, xgboost or lightgbm.
+    """
+    global AI_MODELS
+    models = LazyEnsemble(version)
+    holdout = holdout if holdout is not None else load_holdout()
+    if holdout is None:
+        print("❌ No labelled data available to profile the ensemble!")
+        return None
+    X_raw, y = holdout
+    X = models.scaler.transform(X_raw) if models.scaler is not None else X_raw
+
+    # Profile latency and predictions of every member on the holdout (loaded and warmed up first, so only
+    # prediction is timed)
+    predictions, latency_us = {}, {}
+    for name in models:
+        model = models[name]
+        _predict_member(model, X[:PROFILE_WARMUP_ROWS])
+        started = time.perf_counter()
+        predictions[name] = _predict_member(model, X)
+        latency_us[name] = (time.perf_counter() - started) * 1_000_000 / len(X)
+    kept, baseline = select_members(predictions, latency_us, y, max_accuracy_loss)
+
+    print(f"📊 Ensemble profile (holdout accuracy {baseline:.4f}):")
+    profile = {}
+    for name in models:
+        without = [member for member in models if member != name]
+        profile[name] = {
+            "latency_us_per_row": round(latency_us[name], 3),
+            "accuracy": _ensemble_accuracy(predictions, [name], y),
+            "ensemble_accuracy_without": _ensemble_accuracy(predictions, without, y) if without else None,
+            "kept": name in kept
+        }
+        print(f"   {name:<18} {latency_us[name]:>9.2f} µs/row  {'✅ kept' if name in kept else '✂️ pruned'}")
+
+    # Compile the surviving members into one numpy-only artifact
+    compiled, directory = {}, _version_dir(models.version)
+    scratch_dir = tempfile.mkdtemp(dir=MODEL_STORE_DIR, prefix=".compile-")
+    try:
+        for name in kept:
+            try:
+                compiled[name], profile[name]["compile_mismatch"] = _compile_member(
+                    name, models[name], X, predictions[name], scratch_dir)
+            except ValueError as e:
+                profile[name]["compile_error"] = str(e)
+                print(f"⚠️ Could not compile {name}: {e}")
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    if not compiled:
+        print("❌ No ensemble member could be compiled!")
+        return None
+
+    with secure_store.EncryptedWriter(os.path.join(directory, COMPILED_FILE), ENCRYPTION_KEY) as f:
+        inference.save_compiled(f, compiled, models.scaler, source_version=models.version, profile=profile)
+    manifest = read_manifest(models.version)
+    manifest["compiled"] = {
+        "file": COMPILED_FILE,
+        "encryption": ARTIFACT_ENCRYPTION,
+        "sha256": _file_sha256(os.path.join(directory, COMPILED_FILE)),
+        "members": sorted(compiled),
+        "holdout_accuracy": _ensemble_accuracy(predictions, list(compiled), y),
+        "profile": profile
+    }
+    write_manifest(directory, manifest)
+    if models.version == AI_MODELS.version:
+        AI_MODELS = load_ai_model()
+    print(f"✅ Compiled {len(compiled)} of {len(profile)} members for version {models.version} "
+          f"(holdout accuracy {manifest['compiled']['holdout_accuracy']:.4f}).")
+    return manifest["compiled"]
+
+# 7️⃣ **RUN AI CYBERCRIME OSINT**
+def warm_up():
+    """Loads every ensemble member (or the compiled artifact) once so warm workers score without touching disk."""
+    if USE_COMPILED_MODELS and AI_MODELS.compiled is not None:
+        return AI_MODELS
+    for model_name in AI_MODELS:
+        AI_MODELS[model_name]
+    return AI_MODELS
+
+def run_job(risk_score, num_transactions, num_blackmarket_mentions):
+    """Scores one entity without prompting (used by batch mode)."""
+    data = {
+        "risk_score": risk_score,
+        "num_transactions": num_transactions,
+        "num_blackmarket_mentions": num_blackmarket_mentions
+    }
+    return {"input": data, "cybercrime_risk": float(analyze_cybercrime_risk(data))}
+
 def run():
     """Executes the AI Cybercrime Intelligence module (Fully Dynamic, Secure, and Reliable)."""
     print("🔍 AI Cybercrime OSINT is running...")
@@ -0,0 +1,161 @@
+import os
+import fcntl
+import joblib
+import threading
+import config
+import numpy as np
+from datetime import datetime
+from sklearn.ensemble import IsolationForest
+from modules import secure_store
+
+# 1️⃣ **MODEL STORE**
+# models/anomaly/<domain>/v0001.joblib, v0002.joblib, ... (encrypted) plus a LATEST pointer.
+ANOMALY_MODEL_DIR = "models/anomaly/"
+ANOMALY_FORMAT_VERSION = 2  # 2: reference profiles rebuilt so the alert rows are the anomalous ones
+ANOMALY_TREES = 100
+ANOMALY_CONTAMINATION = 0.1
+ANOMALY_RANDOM_STATE = 42  # fixed, so a retrained version scores the same data the same way
+REFERENCE_ROWS = 4096
+
+DOMAIN_FEATURES = {
+    "crypto": ["active", "log_transactions", "log_received", "log_sent"],  # one row per blockchain
+    "darknet": ["threat_detected", "site_error", "log_mentions"],  # one row per darknet site
+    "social": ["profile_found", "lookup_error"]  # one row per platform
+}
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+def _domain_dir(domain):
+    return os.path.join(ANOMALY_MODEL_DIR, domain)
+
+def _version_file(domain, version):
+    return os.path.join(_domain_dir(domain), f"v{version:04d}.joblib")
+
+def latest_anomaly_version(domain):
+    """Version the domain's LATEST pointer selects, or None if no model was trained yet."""
+    pointer = os.path.join(_domain_dir(domain), "LATEST")
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, "r") as f:
+        return int(f.read().strip())
+
+# 2️⃣ **REFERENCE PROFILES (BOOTSTRAP TRAINING DATA)**
+# The alert conditions must be the rare rows: a found profile (social), a threat
+# with mentions (darknet) and a high-volume wallet (crypto) are anomalous, while
+# empty results and lookup errors are common enough to score as normal.
+def reference_profile(domain, rows=REFERENCE_ROWS):
+    """Deterministic sample of typical feature rows, used to fit a domain's first model version.
+
+    Retrain on real case data with `train_anomaly_model(domain, X)` once enough
+    of it has been collected.
+    """
+    rng = np.random.default_rng(ANOMALY_RANDOM_STATE)
+    u = rng.random(rows)
+    if domain == "crypto":
+        active = (u < 0.6).astype(np.float64)
+        received = rng.lognormal(-1.0, 1.5, rows)
+        features = [np.ones(rows), np.log1p(rng.lognormal(2.0, 1.0, rows)), np.log1p(received),
+                    np.log1p(received * rng.uniform(0.3, 1.0, rows))]
+        return np.column_stack(features) * active[:, None]
+    if domain == "darknet":
+        threat = (u < 0.04).astype(np.float64)
+        error = ((u >= 0.04) & (u < 0.2)).astype(np.float64)
+        return np.column_stack([threat, error, threat * np.log1p(rng.lognormal(2.5, 0.8, rows))])
+    if domain == "social":
+        return np.column_stack([(u < 0.04).astype(np.float64), ((u >= 0.04) & (u < 0.2)).astype(np.float64)])
+    raise KeyError(f"Unknown anomaly domain: {domain}")
+
+# 3️⃣ **TRAINING & VERSIONING**
+def fit_anomaly_model(domain, X=None):
+    """Fits a domain's IsolationForest on `X` (or the reference profile) without publishing it."""
+    X = reference_profile(domain) if X is None else np.asarray(X, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != len(DOMAIN_FEATURES[domain]):
+        raise ValueError(f"{domain} anomaly model expects rows of {len(DOMAIN_FEATURES[domain])} features")
+    return IsolationForest(n_estimators=ANOMALY_TREES, contamination=ANOMALY_CONTAMINATION,
+                           random_state=ANOMALY_RANDOM_STATE).fit(X)
+
+def _publish_lock(domain):
+    """Opens the domain's lock file; `flock` it to serialise check-train-publish across threads and processes."""
+    os.makedirs(_domain_dir(domain), exist_ok=True)
+    return open(os.path.join(_domain_dir(domain), ".lock"), "a")
+
+def _publish_model(domain, X):
+    """Fits and publishes the next version; the caller holds the domain's publish lock."""
+    X = reference_profile(domain) if X is None else np.asarray(X, dtype=np.float64)
+    model = fit_anomaly_model(domain, X)
+    version = (latest_anomaly_version(domain) or 0) + 1
+    artifact = {"format_version": ANOMALY_FORMAT_VERSION, "domain": domain, "version": version, "model": model,
+                "features": DOMAIN_FEATURES[domain], "rows": len(X), "trained": datetime.now().isoformat()}
+    with secure_store.EncryptedWriter(_version_file(domain, version), config.load_encryption_key()) as f:
+        joblib.dump(artifact, f)
+
+    pointer = os.path.join(_domain_dir(domain), "LATEST")
+    with open(f"{pointer}.tmp", "w") as f:
+        f.write(str(version))
+    os.replace(f"{pointer}.tmp", pointer)
+
+    print(f"✅ {domain} anomaly model v{version:04d} trained on {len(X)} rows.")
+    return artifact
+
+def train_anomaly_model(domain, X=None):
+    """Fits a domain's IsolationForest (on `X`, or the reference profile) and publishes it as the next version."""
+    with _publish_lock(domain) as guard:
+        fcntl.flock(guard, fcntl.LOCK_EX)
+        artifact = _publish_model(domain, X)
+    with _scorers_lock:
+        _scorers[domain] = AnomalyScorer(artifact)
+    return artifact["version"]
+
+# 4️⃣ **SHARED SCORER (LOADED ONCE PER PROCESS)**
+class AnomalyScorer:
+    """A pre-fitted, versioned anomaly model; scores whole feature matrices in one call."""
+
+    def __init__(self, artifact):
+        self.domain = artifact["domain"]
+        self.version = artifact["version"]
+        self.features = artifact["features"]
+        self.model = artifact["model"]
+
+    def _matrix(self, X):
+        return np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+
+    def score(self, X):
+        """Anomaly score per row (IsolationForest decision function; below 0 is anomalous)."""
+        return self.model.decision_function(self._matrix(X))
+
+    def predict(self, X):
+        """+1 (normal) or -1 (anomalous) per row."""
+        return self.model.predict(self._matrix(X))
+
+    def risk_level(self, X):
+        """Mean of the row predictions, from -1 (all anomalous) to 1 (all normal); 0.0 for no rows."""
+        X = self._matrix(X)
+        return float(self.predict(X).mean()) if len(X) else 0.0
+
+def get_anomaly_scorer(domain):
+    """Returns the domain's latest model, loading it on first use (and training version 1 if none exists).
+
+    The check, the first training and the publish run under the domain's file
+    lock, so concurrent workers train one version and the others load it.
+    """
+    with _scorers_lock:
+        scorer = _scorers.get(domain)
+    if scorer is not None:
+        return scorer
+
+    with _publish_lock(domain) as guard:
+        fcntl.flock(guard, fcntl.LOCK_EX)
+        version = latest_anomaly_version(domain)
+        artifact = None
+        if version is not None:
+            with secure_store.open_encrypted(_version_file(domain, version), config.load_encryption_key()) as f:
+                artifact = joblib.load(f)
+            if artifact.get("format_version") != ANOMALY_FORMAT_VERSION or artifact["features"] != DOMAIN_FEATURES[domain]:
+                print(f"⚠️ {domain} anomaly model v{version:04d} is outdated; retraining.")
+                artifact = None
+        if artifact is None:
+            artifact = _publish_model(domain, None)
+
+    with _scorers_lock:
+        return _scorers.setdefault(domain, AnomalyScorer(artifact))
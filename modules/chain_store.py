@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 1️⃣ **STORE LOCATION**
+CHAIN_STORE_FILE = "models/chain_store.db"
+ADDRESS_TTL_SECONDS = 3600  # addresses refreshed within this window are served without an API call
+SQLITE_BUSY_TIMEOUT = 30  # seconds a connection waits for another thread's write
+SCHEMA_VERSION = 3
+COLUMN_CHUNK_ROWS = 65536  # rows fetched at a time when iterating the store
+
+os.makedirs(os.path.dirname(CHAIN_STORE_FILE), exist_ok=True)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS addresses (
+    currency TEXT NOT NULL,
+    address TEXT NOT NULL,
+    total_received INTEGER,
+    total_sent INTEGER,
+    final_balance INTEGER,
+    n_tx INTEGER,
+    last_block_height INTEGER,
+    resume_before INTEGER,
+    resume_height INTEGER,
+    resume_stalled INTEGER,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (currency, address)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    currency TEXT NOT NULL,
+    address TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    block_height INTEGER,
+    confirmed TEXT,
+    value INTEGER,
+    fees INTEGER,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (currency, address, tx_hash)
+);
+CREATE INDEX IF NOT EXISTS transactions_by_height ON transactions (currency, address, block_height);
+CREATE TABLE IF NOT EXISTS revisions (
+    currency TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL
+);
+"""
+
+# Version 1 stored full API payloads; compacted rows are rebuilt by re-ingesting every address.
+UPGRADE_TO_V2 = [
+    "ALTER TABLE addresses ADD COLUMN resume_before INTEGER",
+    "ALTER TABLE addresses ADD COLUMN resume_height INTEGER",
+    "ALTER TABLE transactions ADD COLUMN value INTEGER",
+    "ALTER TABLE transactions ADD COLUMN fees INTEGER",
+    "DELETE FROM transactions",
+    "UPDATE addresses SET last_block_height = NULL, fetched_at = 0"
+]
+
+# Version 3 records walks that stalled at `resume_before` (a page the block-height cursor could not move past).
+UPGRADE_TO_V3 = [
+    "ALTER TABLE addresses ADD COLUMN resume_stalled INTEGER"
+]
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+# 2️⃣ **CONNECTIONS (ONE PER THREAD, WAL JOURNAL)**
+def _connection():
+    """Returns this thread's connection, creating the schema on first use."""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(CHAIN_STORE_FILE, timeout=SQLITE_BUSY_TIMEOUT)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")  # readers never block the writer
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with _write_lock, connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            existing = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'addresses'").fetchone()
+            if version < 2 and existing:
+                for statement in UPGRADE_TO_V2:
+                    connection.execute(statement)
+            if version < 3 and existing:
+                for statement in UPGRADE_TO_V3:
+                    connection.execute(statement)
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        _local.connection = connection
+    return connection
+
+# 3️⃣ **READS**
+def get_address(currency, address):
+    """Returns the stored summary of an address (with `stored_txs`), or None if it was never fetched."""
+    row = _connection().execute(
+        "SELECT a.*, (SELECT COUNT(*) FROM transactions t WHERE t.currency = a.currency AND t.address = a.address) "
+        "AS stored_txs FROM addresses a WHERE a.currency = ? AND a.address = ?", (currency, address)).fetchone()
+    return dict(row) if row else None
+
+def is_fresh(entry, max_age=None):
+    """True if a stored address's walk is finished (or stalled) and was refreshed within `max_age` seconds
+    (default ADDRESS_TTL_SECONDS)."""
+    max_age = ADDRESS_TTL_SECONDS if max_age is None else max_age
+    return (entry is not None and (entry["resume_before"] is None or bool(entry["resume_stalled"]))
+            and time.time() - entry["fetched_at"] < max_age)
+
+def known_transactions(currency, address, hashes):
+    """The subset of `hashes` already stored for an address."""
+    hashes = list(hashes)
+    if not hashes:
+        return set()
+    rows = _connection().execute(
+        f"SELECT tx_hash FROM transactions WHERE currency = ? AND address = ? AND tx_hash IN ({', '.join('?' * len(hashes))})",
+        (currency, address, *hashes)).fetchall()
+    return {row["tx_hash"] for row in rows}
+
+def store_revision(currency):
+    """Counter bumped whenever a currency's stored transactions change; 0 if none were stored yet."""
+    row = _connection().execute("SELECT revision FROM revisions WHERE currency = ?", (currency,)).fetchone()
+    return row["revision"] if row else 0
+
+def iter_transactions(currency):
+    """Yields every stored transaction of a currency (compact form), reading the store in bounded chunks.
+
+    A transaction touching several stored addresses is yielded once per address.
+    """
+    cursor = _connection().execute("SELECT payload FROM transactions WHERE currency = ?", (currency,))
+    while True:
+        rows = cursor.fetchmany(COLUMN_CHUNK_ROWS)
+        if not rows:
+            break
+        for row in rows:
+            yield json.loads(row["payload"])
+
+# 4️⃣ **INCREMENTAL WRITES (COMPACT ROWS, RESUMABLE PAGING)**
+def normalize_address(address):
+    """Canonical form used to compare addresses (Ethereum addresses come back lowercase without 0x)."""
+    return address.lower().removeprefix("0x")
+
+def _matches(address, addresses):
+    address = normalize_address(address)
+    return any(normalize_address(candidate) == address for candidate in addresses or [])
+
+def compact_transaction(tx, address):
+    """Keeps only what the store and the transaction graph use: hash, height, time, net value, fees, inputs, outputs."""
+    inputs = [{"addresses": i.get("addresses") or [], "value": i.get("output_value", 0)} for i in tx.get("inputs", [])]
+    outputs = [{"addresses": o.get("addresses") or [], "value": o.get("value", 0)} for o in tx.get("outputs", [])]
+    received = sum(o["value"] for o in outputs if _matches(address, o["addresses"]))
+    spent = sum(i["value"] for i in inputs if _matches(address, i["addresses"]))
+    return {"hash": tx["hash"], "block_height": tx.get("block_height", -1), "confirmed": tx.get("confirmed"),
+            "value": received - spent, "fees": tx.get("fees", 0), "inputs": inputs, "outputs": outputs}
+
+def store_transaction_page(currency, address, data, resume_before=None, resume_height=None, stalled=False):
+    """Merges one page of an `/addrs/{address}/full` walk into the store; returns the new or updated transaction count.
+
+    Transactions are upserted by hash, so a confirmation replaces the stored
+    unconfirmed copy. While a walk is incomplete, `resume_before` (the cursor
+    for the next page) and `resume_height` (the highest block seen so far) are
+    kept so the next refresh continues where it stopped; the last seen block
+    height only advances once the walk is complete (`resume_before` None) or
+    `stalled`, in which case `resume_before` is kept as the point below which
+    the history is incomplete.
+    """
+    rows = []
+    for tx in data.get("txs", []):
+        if "hash" in tx:
+            compact = compact_transaction(tx, address)
+            rows.append((currency, address, compact["hash"], compact["block_height"], compact["confirmed"],
+                         compact["value"], compact["fees"], json.dumps(compact, separators=(",", ":"))))
+
+    connection = _connection()
+    with _write_lock, connection:
+        previous = connection.execute("SELECT last_block_height FROM addresses WHERE currency = ? AND address = ?",
+                                      (currency, address)).fetchone()
+        last_block_height = previous["last_block_height"] if previous else None
+        if (resume_before is None or stalled) and resume_height is not None:
+            last_block_height = max(resume_height, last_block_height or 0)
+            resume_height = None
+
+        before = connection.total_changes
+        connection.executemany(
+            "INSERT INTO transactions (currency, address, tx_hash, block_height, confirmed, value, fees, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (currency, address, tx_hash) DO UPDATE SET "
+            "block_height = excluded.block_height, confirmed = excluded.confirmed, value = excluded.value, "
+            "fees = excluded.fees, payload = excluded.payload WHERE transactions.payload != excluded.payload", rows)
+        changed = connection.total_changes - before
+        if changed:
+            connection.execute("INSERT INTO revisions (currency, revision) VALUES (?, 1) ON CONFLICT (currency) "
+                               "DO UPDATE SET revision = revision + 1", (currency,))
+
+        connection.execute(
+            "INSERT OR REPLACE INTO addresses (currency, address, total_received, total_sent, final_balance, n_tx, "
+            "last_block_height, resume_before, resume_height, resume_stalled, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (currency, address, data.get("total_received", 0), data.get("total_sent", 0), data.get("final_balance"),
+             data.get("n_tx"), last_block_height, resume_before, resume_height, int(stalled), time.time()))
+    return changed
@@ -1,58 +1,271 @@
+import os
+import time
 import requests
 import json
+import threading
 import config
+import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules import anomaly, chain_store, txgraph
 from reportlab.pdfgen import canvas
-from sklearn.ensemble import IsolationForest
+
+# Module manifest (read by core.py without importing this module)
+description = "Blockchain & Crypto Fraud Analysis"
+requires = ["requests", "reportlab", "sklearn", "numpy", "scipy", "joblib"]
+job_args = {"wallet_address": "Enter the crypto wallet address to track: ",
+            "wallet_file": "File of wallet addresses for a bulk scan (blank for one wallet): "}
 
 # 1️⃣ **Blockchain APIs (Bitcoin, Ethereum)**
+# The token is filled in per request so a rotated API key is picked up without a restart.
 BLOCKCHAIN_API_URLS = {
-    "Bitcoin": f"https://api.blockcypher.com/v1/btc/main/addrs/{{}}/full?token={config.OSINTELConfig.BLOCKCYPHER_API_KEY}",
-    "Ethereum": f"https://api.blockcypher.com/v1/eth/main/addrs/{{}}/full?token={config.OSINTELConfig.BLOCKCYPHER_API_KEY}"
+    "Bitcoin": "https://api.blockcypher.com/v1/btc/main/addrs/{}/full?token={}",
+    "Ethereum": "https://api.blockcypher.com/v1/eth/main/addrs/{}/full?token={}"
 }
 
+LOOKUP_TIMEOUT = 10
+MAX_RATE_LIMIT_RETRIES = 3  # HTTP 429 responses retried (after Retry-After) before giving up on a lookup
+TX_PAGE_SIZE = 50  # transactions per `/full` page (the API maximum)
+MAX_PAGES_PER_REFRESH = 20  # pages one refresh may spend; busy wallets resume on the next refresh
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens per second, holds at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+_limiter_lock = threading.Lock()
+_limiter = {"limits": None, "buckets": []}
+_http = threading.local()
+
+def _rate_limiters():
+    """Per-second and per-hour buckets shared by every lookup, rebuilt when the configured plan limits change."""
+    limits = (config.OSINTELConfig.BLOCKCYPHER_REQUESTS_PER_SECOND, config.OSINTELConfig.BLOCKCYPHER_REQUESTS_PER_HOUR)
+    with _limiter_lock:
+        if limits != _limiter["limits"]:
+            per_second, per_hour = limits
+            _limiter["buckets"] = [TokenBucket(per_second, per_second), TokenBucket(per_hour / 3600.0, per_hour)]
+            _limiter["limits"] = limits
+        return _limiter["buckets"]
+
+def _http_session():
+    """One keep-alive session per lookup thread."""
+    if not hasattr(_http, "session"):
+        _http.session = requests.Session()
+    return _http.session
+
+def _blockchain_get(url):
+    """GETs a BlockCypher endpoint within the plan's rate limits, backing off on HTTP 429."""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        for bucket in _rate_limiters():
+            bucket.acquire()
+        response = _http_session().get(url, timeout=LOOKUP_TIMEOUT)
+        if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+        retry_after = response.headers.get("Retry-After", "")
+        time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+
+def _summarize_wallet(currency, entry, verbose):
+    """Builds a wallet finding from its chain-store entry."""
+    num_txs = max(entry["n_tx"] or 0, entry["stored_txs"])  # n_tx is the API's count, even while paging is incomplete
+    total_received = (entry["total_received"] or 0) / 10**8  # Convert Satoshis to BTC
+    total_sent = (entry["total_sent"] or 0) / 10**8
+
+    if verbose:
+        print(f"✅ {currency} Wallet Detected: {num_txs} transactions found.")
+    return {
+        "Total Transactions": num_txs,
+        "Total Received": f"{total_received:.4f} {currency}",
+        "Total Sent": f"{total_sent:.4f} {currency}"
+    }
+
+def ingest_wallet(currency, wallet_address, entry=None, max_pages=MAX_PAGES_PER_REFRESH):
+    """Pages a wallet's transactions into the chain store, newest first; returns the HTTP status of the last page.
+
+    Follows the API's documented `before` / `hasMore` cursor one page at a time,
+    so memory stays bounded by the page size however busy the wallet is. Pages
+    after the first ask for confirmed transactions only, so an unconfirmed
+    backlog cannot hide the history. `before` moves by whole blocks, so each
+    page steps back to just above its lowest block and re-reads that block's
+    start; a page the cursor cannot move past (one block filling the page) or
+    that adds no new transaction stalls the walk, which is then stored as
+    finished down to that point instead of requesting the same page again.
+    Only blocks after the last stored height are fetched, and a walk cut short
+    by `max_pages` resumes from its cursor on the next refresh.
+    """
+    base_url = BLOCKCHAIN_API_URLS[currency].format(wallet_address, config.OSINTELConfig.BLOCKCYPHER_API_KEY)
+    resuming = entry is not None and entry["resume_before"] is not None and not entry["resume_stalled"]
+    after = entry["last_block_height"] if entry else None
+    before = entry["resume_before"] if resuming else None
+    top = entry["resume_height"] if resuming else None
+    confirmed_only = False
+
+    for _ in range(max_pages):
+        url = f"{base_url}&limit={TX_PAGE_SIZE}"
+        if after is not None:
+            url += f"&after={after}"
+        if before is not None:
+            url += f"&before={before}"
+        if before is not None or confirmed_only:
+            url += "&confirmations=1"
+        response = _blockchain_get(url)
+        if response.status_code != 200:
+            return response.status_code
+        data = response.json()
+
+        hashes = {tx["hash"] for tx in data.get("txs", []) if "hash" in tx}
+        heights = [tx.get("block_height", -1) for tx in data.get("txs", []) if tx.get("block_height", -1) >= 0]
+        top = max(heights + ([top] if top is not None else [])) if heights else top
+        new = len(hashes - chain_store.known_transactions(currency, wallet_address, hashes))
+        finished = stalled = False
+        if not data.get("hasMore") or not hashes:
+            before, finished = None, True
+        elif not heights and before is None and not confirmed_only:
+            confirmed_only = True  # unconfirmed transactions fill the page; continue with the confirmed history
+        else:
+            following = min(heights) + 1 if heights else before
+            if following == before or not new:
+                stalled = True
+                point = f"block {before}" if before is not None else "its newest page"
+                print(f"⚠️ {currency} history of {wallet_address} is incomplete below {point}: "
+                      f"the block cursor cannot page past more than {TX_PAGE_SIZE} transactions in one block.")
+            else:
+                before = following
+        chain_store.store_transaction_page(currency, wallet_address, data, before, top, stalled)
+        if finished or stalled:
+            break
+    return 200
+
+def lookup_wallet(currency, wallet_address, verbose=True, max_age=None):
+    """Returns a wallet's finding on one blockchain (summary dict or status string), served from the chain store.
+
+    Addresses refreshed within `max_age` seconds (chain_store.ADDRESS_TTL_SECONDS
+    by default) and offline runs never call the API; older ones fetch only the
+    transactions after the last stored block height.
+    """
+    entry = chain_store.get_address(currency, wallet_address)
+    if entry is not None and (config.OSINTELConfig.OFFLINE_MODE or chain_store.is_fresh(entry, max_age)):
+        return _summarize_wallet(currency, entry, verbose)
+    if config.OSINTELConfig.OFFLINE_MODE:
+        return "⚠️ Offline: wallet not in the local chain store"
+
+    try:
+        status = ingest_wallet(currency, wallet_address, entry)
+        refreshed = chain_store.get_address(currency, wallet_address)
+        if refreshed is not None:
+            entry = refreshed
+        elif status == 429:
+            return "⚠️ Error: rate limit exceeded"
+        else:
+            return "❌ No transactions detected"
+
+    except Exception as e:
+        if entry is None:
+            return f"⚠️ Error: {str(e)}"
+
+    # A failed refresh falls back to what the store already has
+    return _summarize_wallet(currency, entry, verbose)
+
 # 2️⃣ **Monitor Crypto Transactions**
 def monitor_crypto_transactions(wallet_address):
     """Tracks transactions of a given crypto wallet."""
     print(f"🔍 Scanning blockchain transactions for {wallet_address}...")
 
-    findings = {}
-
-    for currency, api_url in BLOCKCHAIN_API_URLS.items():
-        url = api_url.format(wallet_address)
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                num_txs = len(data.get("txs", []))
-                total_received = data.get("total_received", 0) / 10**8  # Convert Satoshis to BTC
-                total_sent = data.get("total_sent", 0) / 10**8
-
-                findings[currency] = {
-                    "Total Transactions": num_txs,
-                    "Total Received": f"{total_received:.4f} {currency}",
-                    "Total Sent": f"{total_sent:.4f} {currency}"
-                }
-                print(f"✅ {currency} Wallet Detected: {num_txs} transactions found.")
-            else:
-                findings[currency] = "❌ No transactions detected"
+    return {currency: lookup_wallet(currency, wallet_address) for currency in BLOCKCHAIN_API_URLS}
 
-        except Exception as e:
-            findings[currency] = f"⚠️ Error: {str(e)}"
+def read_wallet_addresses(path):
+    """Reads one wallet address per line (blank lines and `#` comments skipped, duplicates dropped)."""
+    addresses = []
+    with open(path, "r") as f:
+        for line in f:
+            address = line.split("#", 1)[0].strip()
+            if address:
+                addresses.append(address)
+    return list(dict.fromkeys(addresses))
 
-    return findings
+def scan_wallets(addresses, workers=None):
+    """Looks up many wallets concurrently; yields (address, findings) as each wallet's lookups finish.
 
-# 3️⃣ **AI-Based Crypto Fraud Analysis**
-def ai_crypto_fraud_analysis(findings):
-    """Uses AI to assess blockchain fraud risk."""
-    model = IsolationForest(n_estimators=100, contamination=0.1)
-    data = [{"Fraud_Score": 1 if "Total Transactions" in v else 0} for v in findings.values()]
-    df = json.dumps(data)
+    A lookup that raises is reported as that currency's error finding; the scan goes on.
+    """
+    workers = workers or config.OSINTELConfig.BLOCKCYPHER_SCAN_WORKERS
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="osintel-wallet-scan") as pool:
+        futures = {pool.submit(lookup_wallet, currency, address, False): (address, currency)
+                   for address in addresses for currency in BLOCKCHAIN_API_URLS}
+        for future in as_completed(futures):
+            address, currency = futures[future]
+            findings = pending.setdefault(address, {})
+            try:
+                findings[currency] = future.result()
+            except Exception as e:  # one failed lookup must not abort the rest of the scan
+                findings[currency] = f"⚠️ Error: {str(e)}"
+            if len(findings) == len(BLOCKCHAIN_API_URLS):
+                del pending[address]
+                yield address, {currency: findings[currency] for currency in BLOCKCHAIN_API_URLS}
+
+def scan_wallet_file(path, output_file=None, workers=None):
+    """Bulk-scans the addresses in `path`, streaming one JSON line per wallet to `output_file` as results arrive."""
+    addresses = read_wallet_addresses(path)
+    output_file = output_file or f"Crypto_Scan_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.jsonl"
+    print(f"🔍 Scanning {len(addresses)} wallets from {path}...")
 
-    model.fit([[entry["Fraud_Score"]] for entry in json.loads(df)])
-    fraud_scores = model.predict([[entry["Fraud_Score"]] for entry in json.loads(df)])
+    detected = 0
+    started = time.perf_counter()
+    with open(output_file, "w") as out:
+        for done, (address, findings) in enumerate(scan_wallets(addresses, workers), 1):
+            active = any(isinstance(finding, dict) for finding in findings.values())
+            detected += active
+            out.write(json.dumps({"wallet_address": address, "findings": findings, "active": active}) + "\n")
+            out.flush()
+            if done % 100 == 0:
+                print(f"⏳ {done}/{len(addresses)} wallets scanned ({done / (time.perf_counter() - started):.1f}/s)")
 
-    fraud_risk_level = sum(fraud_scores) / len(fraud_scores)
+    print(f"📄 Bulk scan of {len(addresses)} wallets ({detected} with transactions) saved as {output_file}")
+    return {"wallets": len(addresses), "active": detected, "output": output_file}
+
+def trace_wallet_funds(wallet_address, findings, hops=txgraph.TRACE_HOPS):
+    """Traces the wallet's funds through the (cached) transaction graph of each chain it is active on."""
+    graph_findings = {}
+    for currency, finding in findings.items():
+        if isinstance(finding, dict):
+            graph = txgraph.load_graph(currency)
+            graph_findings[currency] = graph.summarize(wallet_address, hops)
+            print(f"🕸️ {currency} graph: {graph_findings[currency]['Graph Size']}")
+    return graph_findings
+
+# 3️⃣ **AI-Based Crypto Fraud Analysis**
+def crypto_features(findings):
+    """One numeric row per blockchain: active, log transactions, log received, log sent."""
+    rows = []
+    for finding in findings.values():
+        if isinstance(finding, dict):
+            rows.append([1.0, np.log1p(finding["Total Transactions"]), np.log1p(float(finding["Total Received"].split()[0])),
+                         np.log1p(float(finding["Total Sent"].split()[0]))])
+        else:
+            rows.append([0.0, 0.0, 0.0, 0.0])
+    return np.array(rows, dtype=np.float64).reshape(-1, len(anomaly.DOMAIN_FEATURES["crypto"]))
+
+def ai_crypto_fraud_analysis(findings):
+    """Uses AI to assess blockchain fraud risk (shared, pre-fitted anomaly model)."""
+    fraud_risk_level = anomaly.get_anomaly_scorer("crypto").risk_level(crypto_features(findings))
 
     if fraud_risk_level < -0.3:
         print("🚨 HIGH-RISK CRYPTO WALLET DETECTED!")
@@ -60,7 +273,7 @@ def ai_crypto_fraud_analysis(findings):
     return fraud_risk_level
 
 # 4️⃣ **Generate Crypto Intelligence Report (PDF)**
-def generate_crypto_report(wallet_address, findings, fraud_score):
+def generate_crypto_report(wallet_address, findings, fraud_score, graph_findings=None):
     """Creates a detailed Blockchain Intelligence Report in PDF."""
     filename = f"Crypto_Report_{wallet_address}_{datetime.now().strftime('%Y-%m-%d')}.pdf"
     c = canvas.Canvas(filename)
@@ -75,11 +288,22 @@ def generate_crypto_report(wallet_address, findings, fraud_score):
         c.drawString(120, y, f"- {currency}: {result}")
         y -= 20
 
+    if graph_findings:
+        y -= 20
+        c.drawString(100, y, "🕸️ Transaction Graph Tracing:")
+        y -= 20
+        for currency, tracing in graph_findings.items():
+            for key, value in tracing.items():
+                value = (", ".join(value) or "none") if isinstance(value, list) else value
+                c.drawString(120, y, f"- {currency} {key}: {value}")
+                y -= 20
+
     c.drawString(100, y - 20, "🚨 AI Crypto Fraud Score:")
     c.drawString(120, y - 40, f"- Risk Level: {fraud_score}")
 
     c.save()
     print(f"📄 Crypto Intelligence Report saved as {filename}")
+    return filename
 
 # 5️⃣ **Real-Time Alerts Using Telegram (If Enabled)**
 def send_telegram_alert(message):
@@ -92,18 +316,34 @@ def send_telegram_alert(message):
         print("⚠️ Telegram alerts are disabled. Configure in `config.json` if needed.")
 
 # 6️⃣ **Blockchain OSINT Execution**
-def run():
-    """Executes the blockchain intelligence module."""
-    wallet_address = input("Enter the crypto wallet address to track: ")
+def warm_up():
+    """Loads the pre-fitted anomaly model once per process so runs score without touching disk."""
+    return anomaly.get_anomaly_scorer("crypto")
+
+def run_job(wallet_address=None, wallet_file=None):
+    """Runs the blockchain intelligence pipeline for one wallet, or a bulk scan of a wallet file, without prompting."""
+    if wallet_file:
+        return scan_wallet_file(wallet_file)
 
     findings = monitor_crypto_transactions(wallet_address)
     fraud_score = ai_crypto_fraud_analysis(findings)
-    generate_crypto_report(wallet_address, findings, fraud_score)
+    graph_findings = trace_wallet_funds(wallet_address, findings)
+    report_file = generate_crypto_report(wallet_address, findings, fraud_score, graph_findings)
 
     # Send Telegram Alerts if high-risk wallet detected
     if fraud_score < -0.3:
         send_telegram_alert(f"🚨 HIGH-RISK CRYPTO WALLET DETECTED!\nWallet: {wallet_address}")
 
+    return {"wallet_address": wallet_address, "findings": findings, "fraud_score": fraud_score,
+            "graph": graph_findings, "report": report_file}
+
+def run():
+    """Executes the blockchain intelligence module."""
+    wallet_address = input("Enter the crypto wallet address to track (or a file of addresses): ").strip()
+    if os.path.isfile(wallet_address):
+        run_job(wallet_file=wallet_address)
+    else:
+        run_job(wallet_address)
     print("✅ Blockchain OSINT completed.")
 
 if __name__ == "__main__":
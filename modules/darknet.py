@@ -1,12 +1,18 @@
+import re
 import requests
 import time
-import json
 import threading
 import config
+import numpy as np
 from bs4 import BeautifulSoup
 from datetime import datetime
 from reportlab.pdfgen import canvas
-from sklearn.ensemble import IsolationForest
+from modules import anomaly
+
+# Module manifest (read by core.py without importing this module)
+description = "Darknet Intelligence"
+requires = ["requests", "bs4", "reportlab", "sklearn", "numpy", "joblib"]
+job_args = {}
 
 # 1️⃣ **Darknet Configuration**
 TOR_PROXY = {
@@ -46,16 +52,18 @@ def monitor_darknet():
     return findings
 
 # 3️⃣ **AI-Based Cybercrime Risk Analysis**
-def ai_cybercrime_risk_analysis(findings):
-    """Uses AI to assess darknet threat levels."""
-    model = IsolationForest(n_estimators=100, contamination=0.1)
-    data = [{"Threat_Level": len(value.split())} for key, value in findings.items()]
-    df = json.dumps(data)
-
-    model.fit([[entry["Threat_Level"]] for entry in json.loads(df)])
-    risk_scores = model.predict([[entry["Threat_Level"]] for entry in json.loads(df)])
+def darknet_features(findings):
+    """One numeric row per site: threat detected, site error, log mention count."""
+    rows = []
+    for value in findings.values():
+        mentions = re.search(r"\((\d+) mentions found\)", value)
+        rows.append([1.0 if value.startswith("🚨") else 0.0, 1.0 if value.startswith("Error") else 0.0,
+                     np.log1p(int(mentions.group(1))) if mentions else 0.0])
+    return np.array(rows, dtype=np.float64).reshape(-1, len(anomaly.DOMAIN_FEATURES["darknet"]))
 
-    risk_level = sum(risk_scores) / len(risk_scores)
+def ai_cybercrime_risk_analysis(findings):
+    """Uses AI to assess darknet threat levels (shared, pre-fitted anomaly model)."""
+    risk_level = anomaly.get_anomaly_scorer("darknet").risk_level(darknet_features(findings))
 
     if risk_level < -0.5:
         print("🚨 HIGH-RISK CYBERCRIME ACTIVITY DETECTED!")
@@ -82,6 +90,7 @@ def generate_darknet_report(findings, risk_score):
 
     c.save()
     print(f"📄 Intelligence Report saved as {filename}")
+    return filename
 
 # 5️⃣ **Real-Time Alerts Using Telegram (If Enabled)**
 def send_telegram_alert(message):
@@ -94,16 +103,25 @@ def send_telegram_alert(message):
         print("⚠️ Telegram alerts are disabled. Configure in `config.json` if needed.")
 
 # 6️⃣ **Darknet OSINT Execution**
-def run():
-    """Executes the darknet intelligence module."""
+def warm_up():
+    """Loads the pre-fitted anomaly model once per process so runs score without touching disk."""
+    return anomaly.get_anomaly_scorer("darknet")
+
+def run_job():
+    """Runs the darknet intelligence pipeline without prompting (used by batch mode)."""
     findings = monitor_darknet()
     risk_score = ai_cybercrime_risk_analysis(findings)
-    generate_darknet_report(findings, risk_score)
+    report_file = generate_darknet_report(findings, risk_score)
 
     # Send Telegram Alerts if high-risk activity detected
     if risk_score < -0.5:
         send_telegram_alert(f"🚨 HIGH-RISK DARKNET ACTIVITY DETECTED!\nThreat Level: {risk_score}")
 
+    return {"findings": findings, "risk_score": risk_score, "report": report_file}
+
+def run():
+    """Executes the darknet intelligence module."""
+    run_job()
     print("✅ Darknet OSINT completed.")
 
 if __name__ == "__main__":
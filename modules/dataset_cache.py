@@ -0,0 +1,173 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import config
+import requests
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from datetime import datetime
+from modules import secure_store
+
+# 1️⃣ **CACHE LOCATION**
+DATASET_CACHE_DIR = "models/dataset_cache/"
+CACHE_INDEX_FILE = f"{DATASET_CACHE_DIR}index.json"
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_BLOCK_SIZE = 1 << 20
+
+os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+
+CACHE_ENCRYPTION_KEY = config.load_encryption_key()
+_index_lock = threading.Lock()
+
+# 2️⃣ **CACHE INDEX (URL → CONTENT HASH + VALIDATORS)**
+def load_cache_index():
+    """Loads the cache index mapping each source URL to its content hash and HTTP validators."""
+    if not os.path.exists(CACHE_INDEX_FILE):
+        return {}
+    with open(CACHE_INDEX_FILE, "r") as f:
+        return json.load(f)
+
+def _update_cache_index(url, entry):
+    """Atomically records a source's cache entry."""
+    with _index_lock:
+        index = load_cache_index()
+        index[url] = entry
+        temp_file = f"{CACHE_INDEX_FILE}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(index, f, indent=4)
+        os.replace(temp_file, CACHE_INDEX_FILE)
+
+def _blob_path(sha256):
+    return os.path.join(DATASET_CACHE_DIR, f"{sha256}.parquet.enc")
+
+# 3️⃣ **COLUMNAR CONVERSION (ENCRYPTED AT REST)**
+def read_api_payload(path):
+    """Flattens a JSON API payload (a list of records) into a DataFrame."""
+    with open(path, "r") as f:
+        return pd.json_normalize(json.load(f))
+
+def _convert_to_parquet(source_path, dataset_format, target_path, numeric_columns=()):
+    """Converts a downloaded CSV (streamed batch by batch) or JSON API payload to encrypted Parquet.
+
+    `numeric_columns` are read as float64 instead of typed from the first CSV
+    block, so a later block with decimals or blanks does not fail the
+    conversion. A failed conversion leaves no blob behind (the writer discards
+    its partial container).
+    """
+    with secure_store.EncryptedWriter(target_path, CACHE_ENCRYPTION_KEY) as target:
+        if dataset_format == "csv":
+            convert_options = pacsv.ConvertOptions(column_types={column: pa.float64() for column in numeric_columns})
+            reader = pacsv.open_csv(source_path, convert_options=convert_options)
+            with pq.ParquetWriter(target, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        else:
+            pq.write_table(pa.Table.from_pandas(read_api_payload(source_path), preserve_index=False), target)
+
+def open_cached_dataset(path):
+    """Returns something `pq.ParquetFile` can read: a seekable decrypting reader for cached blobs, else the path."""
+    if secure_store.is_encrypted(path):
+        return secure_store.open_encrypted(path, CACHE_ENCRYPTION_KEY)
+    return path
+
+def _download(url, headers):
+    """Streams a response body to a temporary file while hashing it; returns (response, path, sha256).
+
+    The response is closed on return (its status and headers stay readable),
+    so an unused body never holds the connection open.
+    """
+    with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code != 200:
+            return response, None, None
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=DATASET_CACHE_DIR, suffix=".download")
+        with os.fdopen(fd, "wb") as f:
+            for block in response.iter_content(DOWNLOAD_BLOCK_SIZE):
+                digest.update(block)
+                f.write(block)
+    return response, temp_path, digest.hexdigest()
+
+# 4️⃣ **CACHED DATASET ACCESS**
+def cached_dataset_path(dataset, offline=None, numeric_columns=()):
+    """Returns a local path for a dataset source, downloading it only when it changed.
+
+    `file://` URLs and plain paths are served directly, in their declared
+    format (read them with that format, not as Parquet). Remote sources are
+    revalidated with ETag / Last-Modified; unchanged sources (HTTP 304) and
+    offline runs are served from the content-addressed Parquet cache, where
+    `numeric_columns` of CSV sources are stored as float64.
+    """
+    url = dataset["url"]
+    if url.startswith("file://"):
+        return url[len("file://"):]
+    if "://" not in url:
+        return url
+
+    offline = config.OSINTELConfig.OFFLINE_MODE if offline is None else offline
+    entry = load_cache_index().get(url)
+    cached_path = _blob_path(entry["sha256"]) if entry else None
+    has_cache = cached_path is not None and os.path.exists(cached_path)
+
+    if offline:
+        if not has_cache:
+            raise FileNotFoundError(f"{dataset['name']} is not cached and offline mode is enabled")
+        return cached_path
+
+    headers = {}
+    if has_cache:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response, download_path, sha256 = _download(url, headers)
+    except requests.exceptions.RequestException as e:
+        if has_cache:
+            print(f"⚠️ {dataset['name']} unreachable ({e}); using cached copy.")
+            return cached_path
+        raise
+
+    if response.status_code == 304 and has_cache:
+        print(f"✅ {dataset['name']} unchanged; using cached copy.")
+        return cached_path
+    if download_path is None:
+        if has_cache:
+            print(f"⚠️ {dataset['name']} returned HTTP {response.status_code}; using cached copy.")
+            return cached_path
+        raise ValueError(f"HTTP {response.status_code} while fetching {url}")
+
+    try:
+        blob_path = _blob_path(sha256)
+        if not os.path.exists(blob_path):
+            _convert_to_parquet(download_path, dataset["format"], blob_path, numeric_columns)
+    finally:
+        os.remove(download_path)
+
+    _update_cache_index(url, {
+        "sha256": sha256,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": datetime.now().isoformat()
+    })
+    return blob_path
+
+def prune_dataset_cache():
+    """Deletes cached Parquet blobs (including pre-encryption ones) that no source in the index points to any more.
+
+    Run it once the sources being fetched are done: a blob converted but not
+    yet indexed counts as unreferenced.
+    """
+    removed = 0
+    with _index_lock:
+        referenced = {os.path.basename(_blob_path(entry["sha256"])) for entry in load_cache_index().values()}
+        for name in os.listdir(DATASET_CACHE_DIR):
+            if name.endswith((".parquet", ".parquet.enc")) and name not in referenced:
+                os.remove(os.path.join(DATASET_CACHE_DIR, name))
+                removed += 1
+    return removed
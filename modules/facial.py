@@ -1,14 +1,33 @@
 import os
 import cv2
 import json
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+import joblib
+import hashlib
 import numpy as np
 import requests
 import config
 import face_recognition
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.utils import ImageReader
+from modules import secure_store
+
+try:
+    import faiss
+except ImportError:  # optional: approximate nearest-neighbour index for very large galleries
+    faiss = None
+
+# Module manifest (read by core.py without importing this module)
+description = "Facial Recognition & Suspect Tracking"
+requires = ["cv2", "numpy", "requests", "face_recognition", "reportlab", "joblib"]
+job_args = {"video_source": "Camera index or video file (blank for default webcam): "}
 
 # UI Colors
 RED = "\033[1;31m"
@@ -22,6 +41,15 @@ RESET = "\033[0m"
 # 1️⃣ **DIRECTORY SETUP**
 FACIAL_DATA_DIR = "models/facial_data/"
 KNOWN_FACES_FILE = f"{FACIAL_DATA_DIR}known_faces.json"
+FACE_GALLERY_FILE = f"{FACIAL_DATA_DIR}gallery.enc"  # encrypted encoding matrix + name/hash index
+FACE_GALLERY_FORMAT = 1
+SUSPECT_REFRESH_SECONDS = 24 * 3600  # re-download the suspect images at most once a day
+SUSPECT_FETCH_WORKERS = 8  # concurrent image downloads
+SUSPECT_FETCH_TIMEOUT = 10
+FACE_INDEX = "auto"  # "exact" (numpy), "hnsw" (faiss) or "auto" (hnsw for large galleries when faiss is installed)
+FACE_INDEX_MIN_GALLERY = 20_000  # gallery size from which "auto" switches to the HNSW index
+FACE_INDEX_NEIGHBOURS = 32  # HNSW graph degree
+FACE_INDEX_SEARCH_DEPTH = 128  # HNSW candidates examined per lookup (recall vs. speed)
 DATASET_CONFIG_FILE = "models/datasets.json"
 REPORTS_DIR = "reports/"
 
@@ -41,78 +69,275 @@ def load_facial_datasets():
     return datasets.get("facial_recognition", [])
 
 # 3️⃣ **DOWNLOAD AND STORE SUSPECT IMAGES**
-def fetch_suspect_faces():
-    """Fetches and stores images from facial recognition datasets."""
-    datasets = load_facial_datasets()
-    known_faces = {}
-
-    print(f"{CYAN}🔍 Downloading suspect images from databases...{RESET}")
-    
-    for dataset in datasets:
-        name = dataset["name"]
-        url = dataset["url"]
-
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                image_path = os.path.join(FACIAL_DATA_DIR, f"{name}.jpg")
-
-                with open(image_path, "wb") as f:
-                    f.write(response.content)
+def suspect_faces_stale(max_age=SUSPECT_REFRESH_SECONDS):
+    """True if the suspect images were never downloaded or are older than `max_age` seconds."""
+    if not os.path.exists(KNOWN_FACES_FILE):
+        return True
+    return time.time() - os.path.getmtime(KNOWN_FACES_FILE) > max_age
+
+_http = threading.local()
+
+def _http_session():
+    """One pooled HTTP session per download thread (sessions are not shared across threads)."""
+    if not hasattr(_http, "session"):
+        _http.session = requests.Session()
+    return _http.session
+
+def _write_atomically(path, content):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+def _fetch_suspect_image(dataset, previous):
+    """Revalidates one suspect image; returns (name, entry or None, "changed" | "unchanged" | "failed", detail)."""
+    name = dataset["name"]
+    image_path = os.path.join(FACIAL_DATA_DIR, f"{name}.jpg")
+    headers = {}
+    if previous and os.path.exists(previous["image"]):
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        response = _http_session().get(dataset["url"], headers=headers, timeout=SUSPECT_FETCH_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return name, previous, "failed", str(e)
+    if response.status_code == 304 and headers:
+        return name, previous, "unchanged", None
+    if response.status_code != 200:
+        return name, previous, "failed", f"HTTP {response.status_code}"
+
+    entry = {
+        "image": image_path,
+        "sha256": hashlib.sha256(response.content).hexdigest(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified")
+    }
+    if previous and previous.get("sha256") == entry["sha256"] and os.path.exists(previous["image"]):
+        return name, dict(previous, etag=entry["etag"], last_modified=entry["last_modified"]), "unchanged", None
+    _write_atomically(image_path, response.content)
+    return name, entry, "changed", None
+
+def fetch_suspect_faces(force=False):
+    """Syncs the suspect images from the facial recognition datasets; returns the names whose image changed.
+
+    Images are revalidated concurrently with ETag / Last-Modified, so unchanged
+    ones are neither downloaded nor rewritten. Files are replaced atomically and
+    a failed fetch keeps the image already on disk. Skipped (returns []) while
+    the last sync is fresh.
+    """
+    if not force and not suspect_faces_stale():
+        return []
+    if config.OSINTELConfig.OFFLINE_MODE and os.path.exists(KNOWN_FACES_FILE):
+        print(f"{YELLOW}⚠️ Offline mode: using the suspect images already on disk.{RESET}")
+        return []
 
-                known_faces[name] = {"image": image_path}
+    datasets = load_facial_datasets()
+    previous_faces = {}
+    if os.path.exists(KNOWN_FACES_FILE):
+        with open(KNOWN_FACES_FILE, "r") as f:
+            previous_faces = json.load(f)
+    known_faces, changed, unchanged, failed = {}, [], 0, 0
+
+    print(f"{CYAN}🔍 Syncing {len(datasets)} suspect image(s) from databases...{RESET}")
+
+    with ThreadPoolExecutor(max_workers=SUSPECT_FETCH_WORKERS) as pool:
+        futures = [pool.submit(_fetch_suspect_image, dataset, previous_faces.get(dataset["name"]))
+                   for dataset in datasets]
+        for future in as_completed(futures):
+            name, entry, status, detail = future.result()
+            if status == "changed":
+                changed.append(name)
                 print(f"{GREEN}✅ Downloaded suspect image: {name}{RESET}")
-            else:
-                print(f"{YELLOW}⚠️ Failed to fetch {name}: HTTP {response.status_code}{RESET}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"{YELLOW}⚠️ Failed to fetch {name}: {str(e)}{RESET}")
-
-    with open(KNOWN_FACES_FILE, "w") as f:
-        json.dump(known_faces, f, indent=4)
+            elif status == "unchanged":
+                unchanged += 1
+            elif status == "failed":
+                failed += 1
+                kept = " (keeping the previous image)" if entry else ""
+                print(f"{YELLOW}⚠️ Failed to fetch {name}: {detail}{kept}{RESET}")
+            if entry:
+                known_faces[name] = entry
+
+    _write_atomically(KNOWN_FACES_FILE, json.dumps(dict(sorted(known_faces.items())), indent=4).encode())
+    print(f"{GREEN}✅ Suspect images synced: {len(changed)} changed, {unchanged} unchanged, {failed} failed.{RESET}")
+    return sorted(changed)
+
+# 4️⃣ **PERSISTENT FACE-ENCODING GALLERY**
+def _image_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_face_gallery():
+    """Memory-maps the stored gallery: {"encodings": (n, 128) float32, "names": [...], "hashes": [...], "faceless": [...]}."""
+    if not os.path.exists(FACE_GALLERY_FILE):
+        return None
+    try:
+        key = config.load_encryption_key()
+        shared = secure_store.shared_plaintext(FACE_GALLERY_FILE, key)
+        if shared is not None:
+            gallery = joblib.load(shared, mmap_mode="r")
+        else:
+            with secure_store.open_encrypted(FACE_GALLERY_FILE, key) as f:
+                gallery = joblib.load(f)
+    except (ValueError, EOFError) as e:  # tampered, truncated or encrypted with another key
+        print(f"{YELLOW}⚠️ Face gallery unreadable ({e}); rebuilding it from the suspect images.{RESET}")
+        return None
+    return gallery if gallery.get("format_version") == FACE_GALLERY_FORMAT else None
+
+def _empty_gallery():
+    return {"format_version": FACE_GALLERY_FORMAT, "encodings": np.zeros((0, 128), dtype=np.float32),
+            "names": [], "hashes": [], "faceless": []}
+
+def save_face_gallery(gallery):
+    """Writes the gallery as one encrypted joblib container holding a contiguous float32 matrix."""
+    with secure_store.EncryptedWriter(FACE_GALLERY_FILE, config.load_encryption_key()) as f:
+        joblib.dump(gallery, f)
+
+def update_face_gallery(known_faces):
+    """Brings the gallery in line with the suspect images, encoding only new or changed images.
+
+    Encodings are keyed by image content hash, so renamed or re-downloaded but
+    identical images are never encoded again. Returns the (possibly unchanged)
+    gallery.
+    """
+    gallery = load_face_gallery() or _empty_gallery()
+    row_by_hash = {content_hash: row for row, content_hash in enumerate(gallery["hashes"])}
+    faceless = set(gallery["faceless"])
+
+    names, hashes, rows, new_encodings = [], [], [], []
+    encoded = 0
+    for name, data in sorted(known_faces.items()):
+        image_path = data["image"]
+        if not os.path.exists(image_path):
+            continue
+        content_hash = data.get("sha256") or _image_sha256(image_path)  # recorded by fetch_suspect_faces
+        if content_hash in faceless:
+            continue
+        if content_hash in row_by_hash:
+            rows.append(row_by_hash[content_hash])
+        elif content_hash in hashes:  # same image under another name, encoded above
+            rows.append(rows[hashes.index(content_hash)])
+        else:
+            image = face_recognition.load_image_file(image_path)
+            encoding = face_recognition.face_encodings(image)
+            encoded += 1
+            if not encoding:  # Ensure encoding is not empty
+                faceless.add(content_hash)
+                continue
+            new_encodings.append(np.asarray(encoding[0], dtype=np.float32))
+            rows.append(len(gallery["hashes"]) + len(new_encodings) - 1)
+        names.append(name)
+        hashes.append(content_hash)
+
+    if names == list(gallery["names"]) and hashes == list(gallery["hashes"]) and not encoded:
+        return gallery
+
+    all_encodings = np.vstack([np.asarray(gallery["encodings"])] + [encoding[None, :] for encoding in new_encodings])
+    gallery = {
+        "format_version": FACE_GALLERY_FORMAT,
+        "encodings": np.ascontiguousarray(all_encodings[rows], dtype=np.float32).reshape(len(rows), 128),
+        "names": names,
+        "hashes": hashes,
+        "faceless": sorted(faceless)
+    }
+    save_face_gallery(gallery)
+    print(f"{GREEN}✅ Face gallery updated: {len(names)} suspects, {encoded} image(s) encoded.{RESET}")
+    return load_face_gallery()
 
-# 4️⃣ **LOAD KNOWN FACES FOR MATCHING**
 def load_known_faces():
-    """Loads stored known faces and encodes them for facial recognition."""
+    """Loads the known suspects' face encodings from the gallery (encoding only images that changed) into a FaceMatcher."""
     if not os.path.exists(KNOWN_FACES_FILE):
         print(f"{RED}❌ No known faces found. Downloading now...{RESET}")
-        fetch_suspect_faces()
+        fetch_suspect_faces(force=True)
 
     with open(KNOWN_FACES_FILE, "r") as f:
         known_faces = json.load(f)
 
-    encoded_faces = {}
-    for name, data in known_faces.items():
-        image_path = data["image"]
-        if os.path.exists(image_path):
-            image = face_recognition.load_image_file(image_path)
-            encoding = face_recognition.face_encodings(image)
-            if encoding:  # Ensure encoding is not empty
-                encoded_faces[name] = encoding[0]
-
-    return encoded_faces
+    gallery = update_face_gallery(known_faces) or _empty_gallery()  # None if the rewritten gallery is unreadable
+    return FaceMatcher(gallery["encodings"], gallery["names"])
+
+# 5️⃣ **REAL-TIME FACIAL RECOGNITION (VECTORIZED GALLERY MATCHING)**
+class FaceMatcher:
+    """Finds the nearest suspect for many face encodings at once.
+
+    Small galleries are searched exactly with one matrix product per frame;
+    large ones (or FACE_INDEX = "hnsw") use a faiss HNSW graph, whose lookup
+    time barely grows with the gallery.
+    """
+
+    def __init__(self, encodings, names, index=None):
+        index = index or FACE_INDEX
+        self.encodings = np.ascontiguousarray(encodings, dtype=np.float32).reshape(len(names), 128)
+        self.names = list(names)
+        self._squared_norms = np.einsum("ij,ij->i", self.encodings, self.encodings)
+        self.index = None
+        if index == "hnsw" or (index == "auto" and len(self.names) >= FACE_INDEX_MIN_GALLERY):
+            if faiss is None:
+                print(f"{YELLOW}⚠️ faiss is not installed; matching the gallery exactly.{RESET}")
+            else:
+                self.index = faiss.IndexHNSWFlat(self.encodings.shape[1], FACE_INDEX_NEIGHBOURS)
+                self.index.hnsw.efSearch = FACE_INDEX_SEARCH_DEPTH
+                self.index.add(self.encodings)
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self, unknown_encodings):
+        """Returns (gallery rows, Euclidean distances) of the closest suspect for each encoding (infinite if there is none)."""
+        unknown = np.asarray(unknown_encodings, dtype=np.float32).reshape(-1, self.encodings.shape[1])
+        if not len(self.names) or not len(unknown):
+            return np.zeros(len(unknown), dtype=np.int64), np.full(len(unknown), np.inf, dtype=np.float32)
+        if self.index is not None:
+            squared, rows = self.index.search(unknown, 1)
+            return rows[:, 0], np.sqrt(np.maximum(squared[:, 0], 0))
+
+        # |u - g|² = |u|² + |g|² - 2 u·g for every (face, suspect) pair in one product
+        squared = (np.einsum("ij,ij->i", unknown, unknown)[:, None] + self._squared_norms[None, :]
+                   - 2.0 * unknown @ self.encodings.T)
+        rows = np.argmin(squared, axis=1)
+        return rows, np.sqrt(np.maximum(squared[np.arange(len(rows)), rows], 0))
+
+    def match(self, unknown_encodings, tolerance=0.5):
+        """Returns (suspect name or None if farther than `tolerance`, distance) for each encoding."""
+        rows, distances = self.nearest(unknown_encodings)
+        return [(self.names[row] if distance <= tolerance else None, float(distance))
+                for row, distance in zip(rows, distances)]
 
-# 5️⃣ **REAL-TIME FACIAL RECOGNITION**
 def recognize_face(frame, known_faces, tolerance=0.5):
     """Compares detected faces with known suspects with a set tolerance."""
     unknown_encodings = face_recognition.face_encodings(frame)
 
-    for unknown_encoding in unknown_encodings:
-        for suspect, known_encoding in known_faces.items():
-            results = face_recognition.compare_faces([known_encoding], unknown_encoding, tolerance=tolerance)
-            face_distance = face_recognition.face_distance([known_encoding], unknown_encoding)[0]
-
-            if True in results:
+    for suspect, face_distance in known_faces.match(unknown_encodings, tolerance):
+        if suspect is not None:
+            if get_report_dispatcher().submit(suspect, face_distance):
                 print(f"{RED}🚨 MATCH FOUND: {suspect} (Confidence: {round((1 - face_distance) * 100, 2)}%) {RESET}")
-                generate_face_report(suspect)
-                return suspect
+            return suspect
 
     return None
 
-# 6️⃣ **GENERATE FACIAL RECOGNITION REPORT**
-def generate_face_report(suspect_name):
-    """Creates a detailed facial recognition report in PDF format."""
-    filename = os.path.join(REPORTS_DIR, f"Facial_Recognition_Report_{datetime.now().strftime('%Y-%m-%d')}.pdf")
+# 6️⃣ **GENERATE FACIAL RECOGNITION REPORT (OFF THE FRAME LOOP)**
+REPORT_DEBOUNCE_SECONDS = 300  # one report/alert per suspect within this window
+
+_suspect_images = {"mtime": None, "faces": {}}
+
+def _suspect_image_path(suspect_name):
+    """Looks up a suspect's image, re-reading known_faces.json only when it changed."""
+    if not os.path.exists(KNOWN_FACES_FILE):
+        return None
+    mtime = os.path.getmtime(KNOWN_FACES_FILE)
+    if mtime != _suspect_images["mtime"]:
+        with open(KNOWN_FACES_FILE, "r") as f:
+            _suspect_images["faces"] = json.load(f)
+        _suspect_images["mtime"] = mtime
+    return _suspect_images["faces"].get(suspect_name, {}).get("image")
+
+def generate_face_report(suspect_name, confidence=None, detected_at=None):
+    """Creates a detailed facial recognition report in PDF format (one file per suspect and detection)."""
+    detected_at = detected_at or datetime.now()
+    safe_name = "".join(ch if ch.isalnum() else "_" for ch in suspect_name)
+    filename = os.path.join(REPORTS_DIR, f"Facial_Recognition_Report_{safe_name}_{detected_at.strftime('%Y-%m-%d_%H%M%S')}.pdf")
     c = canvas.Canvas(filename, pagesize=letter)
 
     # Report Header
@@ -120,45 +345,333 @@ def generate_face_report(suspect_name):
     c.drawString(100, 750, "🚨 OSINTEL Facial Recognition Report")
     c.setFont("Helvetica", 12)
     c.drawString(100, 730, f"Suspect Matched: {suspect_name}")
-    c.drawString(100, 710, f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    c.drawString(100, 710, f"Date: {detected_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    if confidence is not None:
+        c.drawString(100, 690, f"Confidence: {confidence}%")
 
     # Insert Suspect Image
-    known_faces = json.load(open(KNOWN_FACES_FILE, "r"))
-    if suspect_name in known_faces:
-        image_path = known_faces[suspect_name]["image"]
-        if os.path.exists(image_path):
-            suspect_image = ImageReader(image_path)
-            c.drawImage(suspect_image, 100, 500, width=200, height=200)
+    image_path = _suspect_image_path(suspect_name)
+    if image_path and os.path.exists(image_path):
+        suspect_image = ImageReader(image_path)
+        c.drawImage(suspect_image, 100, 450, width=200, height=200)
 
     c.save()
     print(f"{GREEN}📄 Facial Recognition Report saved as {filename}{RESET}")
-
-# 7️⃣ **RUN FACIAL RECOGNITION SYSTEM**
-def run():
-    """Executes the facial recognition module with UI improvements."""
-    print(f"{CYAN}🔍 OSINTEL Facial Recognition System is starting...{RESET}")
-    fetch_suspect_faces()
-    known_faces = load_known_faces()
-
-    cap = cv2.VideoCapture(0)
+    return filename
+
+def send_telegram_alert(message):
+    """Sends alerts via Telegram if the bot token is set in config."""
+    if config.OSINTELConfig.TELEGRAM_BOT_TOKEN:
+        url = f"https://api.telegram.org/bot{config.OSINTELConfig.TELEGRAM_BOT_TOKEN}/sendMessage"
+        data = {"chat_id": config.OSINTELConfig.TELEGRAM_CHAT_ID, "text": message}
+        requests.post(url, data=data, timeout=10)
+    else:
+        print(f"{YELLOW}⚠️ Telegram alerts are disabled. Configure in `config.json` if needed.{RESET}")
+
+class ReportDispatcher:
+    """Renders match reports and sends alerts on a background thread, at most once per suspect per debounce window."""
+
+    def __init__(self, debounce_seconds=REPORT_DEBOUNCE_SECONDS):
+        self.debounce_seconds = debounce_seconds
+        self.dispatched = 0
+        self.suppressed = 0
+        self._last_dispatch = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="osintel-face-reports", daemon=True)
+        self._thread.start()
+
+    def submit(self, suspect_name, face_distance):
+        """Queues a report for a match unless the suspect was reported within the window; never blocks."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_dispatch.get(suspect_name)
+            if last is not None and now - last < self.debounce_seconds:
+                self.suppressed += 1
+                return False
+            self._last_dispatch[suspect_name] = now
+            self.dispatched += 1
+        self._queue.put((suspect_name, face_distance, datetime.now()))
+        return True
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                suspect_name, face_distance, detected_at = item
+                confidence = round((1 - face_distance) * 100, 2)
+                generate_face_report(suspect_name, confidence, detected_at)
+                send_telegram_alert(f"🚨 SUSPECT DETECTED!\nSuspect: {suspect_name}\nConfidence: {confidence}%")
+            except Exception as e:
+                print(f"{YELLOW}⚠️ Could not report match for {item[0]}: {e}{RESET}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Waits until every queued report has been written (call outside the frame loop)."""
+        self._queue.join()
+
+_report_dispatcher = None
+
+def get_report_dispatcher():
+    """Returns the process-wide report dispatcher, starting its thread on first use."""
+    global _report_dispatcher
+    if _report_dispatcher is None:
+        _report_dispatcher = ReportDispatcher()
+    return _report_dispatcher
+
+# 7️⃣ **PIPELINED VIDEO PROCESSING (CAPTURE → DETECT → TRACK → ENCODE)**
+DETECTION_SCALE = 0.25  # faces are detected on frames downscaled by this factor
+DETECTION_INTERVAL = 2  # detect on every Nth frame; tracks keep their identity in between
+TRACK_IOU_THRESHOLD = 0.3  # box overlap needed to continue an existing track
+TRACK_MAX_MISSES = 10  # detection passes a track may miss before it is dropped
+FACE_CROP_PADDING = 0.25  # context kept around a face box when it is shipped to an encoder
+ENCODER_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+CAPTURE_QUEUE_SIZE = 8
+
+def _capture_frames(cap, frames, live, stop):
+    """Capture thread: queues frames; a live camera drops its oldest frame rather than falling behind."""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        while not stop.is_set():
+            try:
+                frames.put(frame, timeout=0.1)
+                break
+            except queue.Full:
+                if live:
+                    try:
+                        frames.get_nowait()
+                    except queue.Empty:
+                        pass
+    if not stop.is_set():
+        frames.put(None)
+
+def detect_faces(frame, scale=DETECTION_SCALE):
+    """Finds faces on a downscaled copy of a BGR frame; returns (top, right, bottom, left) boxes in full-frame pixels."""
+    small = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+    locations = face_recognition.face_locations(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    return [tuple(int(round(value / scale)) for value in location) for location in locations]
+
+def _box_iou(a, b):
+    top, right, bottom, left = max(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])
+    overlap = max(0, right - left) * max(0, bottom - top)
+    if not overlap:
+        return 0.0
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    return overlap / (area_a + area_b - overlap)
+
+class FaceTracker:
+    """Follows face boxes across frames by overlap, so each appearance of a face is encoded only once."""
+
+    def __init__(self):
+        self.tracks = {}
+        self._ids = itertools.count(1)
+
+    def update(self, boxes):
+        """Assigns detected boxes to tracks and returns the ids of tracks that just appeared."""
+        unmatched = set(self.tracks)
+        new_tracks = []
+        for box in boxes:
+            best = max(unmatched, key=lambda track_id: _box_iou(self.tracks[track_id]["box"], box), default=None)
+            if best is not None and _box_iou(self.tracks[best]["box"], box) >= TRACK_IOU_THRESHOLD:
+                self.tracks[best].update(box=box, misses=0)
+                unmatched.discard(best)
+            else:
+                track_id = next(self._ids)
+                self.tracks[track_id] = {"box": box, "misses": 0, "name": None, "distance": None}
+                new_tracks.append(track_id)
+
+        for track_id in unmatched:
+            self.tracks[track_id]["misses"] += 1
+            if self.tracks[track_id]["misses"] > TRACK_MAX_MISSES:
+                del self.tracks[track_id]
+        return new_tracks
+
+def _face_crop(frame, box):
+    """Cuts a padded face region out of a frame; returns the crop and the box relative to it."""
+    top, right, bottom, left = box
+    pad_y, pad_x = int((bottom - top) * FACE_CROP_PADDING), int((right - left) * FACE_CROP_PADDING)
+    y0, x0 = max(top - pad_y, 0), max(left - pad_x, 0)
+    y1, x1 = min(bottom + pad_y, frame.shape[0]), min(right + pad_x, frame.shape[1])
+    return np.ascontiguousarray(frame[y0:y1, x0:x1]), (top - y0, right - x0, bottom - y0, left - x0)
+
+def _encode_face(crop, location):
+    """Encoder-process task: returns the float32 encoding of the face at `location` in a BGR crop, or None."""
+    encodings = face_recognition.face_encodings(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB), known_face_locations=[location])
+    return np.asarray(encodings[0], dtype=np.float32) if encodings else None
+
+def _draw_tracks(frame, tracker):
+    for track in tracker.tracks.values():
+        top, right, bottom, left = track["box"]
+        color = (0, 0, 255) if track["name"] else (0, 255, 0)
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+        if track["name"]:
+            cv2.putText(frame, track["name"], (left, max(top - 8, 0)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+def run_pipeline(video_source, known_faces, display=True, tolerance=0.5):
+    """Recognizes suspects with capture, detection/tracking and encoding overlapped.
+
+    A capture thread feeds frames; the main thread detects faces on downscaled
+    frames every DETECTION_INTERVAL frames and tracks them; only new tracks are
+    sent to the encoder process pool. Returns the matches and throughput stats.
+    """
+    cap = cv2.VideoCapture(video_source)
+    if not cap.isOpened():
+        print(f"{RED}❌ Could not open video source {video_source}!{RESET}")
+        return {"matches": [], "stats": {"frames": 0, "seconds": 0.0, "fps": 0.0, "faces_encoded": 0}}
+
+    frames = queue.Queue(maxsize=CAPTURE_QUEUE_SIZE)
+    stop = threading.Event()
+    capture = threading.Thread(target=_capture_frames, name="osintel-capture", daemon=True,
+                               args=(cap, frames, isinstance(video_source, int), stop))
+    tracker = FaceTracker()
+    pending, matches = {}, []
+    frame_count = faces_encoded = 0
+
+    def finish_encoding(future):
+        nonlocal faces_encoded
+        track_id = pending.pop(future)
+        try:
+            encoding = future.result()
+        except Exception as e:
+            print(f"{YELLOW}⚠️ Face encoding failed: {e}{RESET}")
+            return
+        faces_encoded += 1
+        track = tracker.tracks.get(track_id)
+        if track is None or encoding is None:
+            return
+        (suspect, face_distance), = known_faces.match(encoding[None, :], tolerance)
+        track.update(name=suspect, distance=face_distance)
+        if suspect is not None:
+            if get_report_dispatcher().submit(suspect, face_distance):
+                print(f"{RED}🚨 MATCH FOUND: {suspect} (Confidence: {round((1 - face_distance) * 100, 2)}%) {RESET}")
+            matches.append(suspect)
+
+    started = time.perf_counter()
+    # Spawned, not forked: the capture and report threads are already running, and a forked child inherits their locks
+    with ProcessPoolExecutor(max_workers=ENCODER_WORKERS, mp_context=multiprocessing.get_context("spawn")) as encoders:
+        capture.start()
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+
+            if frame_count % DETECTION_INTERVAL == 0:
+                for track_id in tracker.update(detect_faces(frame)):
+                    crop, location = _face_crop(frame, tracker.tracks[track_id]["box"])
+                    pending[encoders.submit(_encode_face, crop, location)] = track_id
+            frame_count += 1
+
+            for future in [future for future in pending if future.done()]:
+                finish_encoding(future)
+
+            if display:
+                _draw_tracks(frame, tracker)
+                cv2.imshow("OSINTEL Facial Recognition", frame)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+
+        stop.set()
+        for future in list(pending):
+            finish_encoding(future)  # waits for the encode; failures are reported, not raised
+
+    elapsed = time.perf_counter() - started
+    capture.join(timeout=1)
+    cap.release()
+    if display:
+        cv2.destroyAllWindows()
+    return {"matches": matches, "stats": {
+        "frames": frame_count,
+        "seconds": round(elapsed, 3),
+        "fps": round(frame_count / elapsed, 2) if elapsed else 0.0,
+        "faces_encoded": faces_encoded
+    }}
+
+# 8️⃣ **RUN FACIAL RECOGNITION SYSTEM**
+_known_faces = None
+_known_faces_key = None
+
+def _file_identity(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns  # both files are replaced atomically, never rewritten in place
+
+def warm_up():
+    """Syncs and encodes the suspect gallery; later runs reuse the encodings until the suspects or the gallery change."""
+    global _known_faces, _known_faces_key
+    fetch_suspect_faces()  # skipped while the last sync is fresh
+    key = (_file_identity(KNOWN_FACES_FILE), _file_identity(FACE_GALLERY_FILE))
+    if _known_faces is None or key != _known_faces_key:
+        _known_faces = load_known_faces()
+        _known_faces_key = (_file_identity(KNOWN_FACES_FILE), _file_identity(FACE_GALLERY_FILE))
+    return _known_faces
+
+def run_serial(video_source, known_faces, display=True, tolerance=0.5):
+    """Recognizes suspects one frame at a time (full-resolution detection and encoding on every frame)."""
+    cap = cv2.VideoCapture(video_source)
+    matches = []
+    frame_count = 0
+    started = time.perf_counter()
 
     while True:
         ret, frame = cap.read()
         if not ret:
-            print(f"{RED}❌ Camera error! Make sure your webcam is connected.{RESET}")
+            if video_source == 0:
+                print(f"{RED}❌ Camera error! Make sure your webcam is connected.{RESET}")
             break
+        frame_count += 1
 
-        suspect_name = recognize_face(frame, known_faces)
+        suspect_name = recognize_face(frame, known_faces, tolerance)
         if suspect_name:
-            print(f"{RED}🚨 ALERT: {suspect_name} detected!{RESET}")
+            matches.append(suspect_name)
 
-        cv2.imshow(f"{CYAN}🔍 OSINTEL Facial Recognition{RESET}", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+        if display:
+            cv2.imshow("OSINTEL Facial Recognition", frame)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
 
+    elapsed = time.perf_counter() - started
     cap.release()
-    cv2.destroyAllWindows()
+    if display:
+        cv2.destroyAllWindows()
+    return {"matches": matches, "stats": {
+        "frames": frame_count,
+        "seconds": round(elapsed, 3),
+        "fps": round(frame_count / elapsed, 2) if elapsed else 0.0
+    }}
+
+def run_job(video_source=0, pipelined=True, display=None):
+    """Runs facial recognition on a camera index or video file and returns the matched suspects and the throughput.
+
+    Video files run headless by default, which makes them usable as an FPS
+    benchmark for the pipelined and serial modes without a camera.
+    """
+    known_faces = warm_up()
+    if isinstance(video_source, str) and video_source.isdigit():
+        video_source = int(video_source)
+    if display is None:
+        display = isinstance(video_source, int)
+
+    if pipelined:
+        result = run_pipeline(video_source, known_faces, display)
+    else:
+        result = run_serial(video_source, known_faces, display)
+    get_report_dispatcher().flush()  # reports are written off the frame loop; wait for them before returning
+    stats = result["stats"]
+    print(f"{CYAN}⏱️ {stats['frames']} frames in {stats['seconds']}s ({stats['fps']} FPS, "
+          f"{'pipelined' if pipelined else 'serial'}){RESET}")
+    return {"video_source": video_source, "matches": result["matches"], "stats": stats}
+
+def run():
+    """Executes the facial recognition module with UI improvements."""
+    print(f"{CYAN}🔍 OSINTEL Facial Recognition System is starting...{RESET}")
+    run_job()
     print(f"{GREEN}✅ Facial Recognition OSINT completed.{RESET}")
 
 if __name__ == "__main__":
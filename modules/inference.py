@@ -0,0 +1,311 @@
+import json
+import joblib
+import numpy as np
+
+# 1️⃣ **COMPILED ARTIFACT FORMAT**
+# A compiled ensemble is one joblib file holding plain numpy arrays, so scoring
+# needs nothing but numpy and joblib (no tensorflow, torch, catboost, xgboost,
+# lightgbm or sklearn) and the arrays are memory-mapped and shared between
+# processes. Every tree-based member is flattened into one node table in which
+# an internal node sends a row left when `x[feature] <= threshold`.
+COMPILED_FORMAT_VERSION = 1
+COMPILED_CHUNK_ROWS = 8192  # rows per evaluation pass; bounds the (rows x trees) temporaries
+
+# 2️⃣ **MEMBER CONVERTERS (TRAINED MODEL → NUMPY ARRAYS)**
+LOGISTIC_OBJECTIVES = ("binary:logistic", "reg:logistic")  # xgboost objectives whose base_score is a probability
+
+def margin_bias(model):
+    """The constant a boosted model adds to its summed leaf values (its initial prediction, in margin space).
+
+    xgboost keeps it as `base_score`, a probability for logistic objectives;
+    LightGBM folds its initial score into the first tree, so its bias is 0.
+    """
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        learner = json.loads(model.get_booster().save_config())["learner"]
+        base_score = float(np.ravel(json.loads(learner["learner_model_param"]["base_score"]))[0])
+        if learner["objective"]["name"] in LOGISTIC_OBJECTIVES:
+            return float(np.log(base_score / (1.0 - base_score)))
+        return base_score
+    if module.startswith("lightgbm"):
+        return 0.0
+    raise ValueError(f"No margin bias known for {module}.{type(model).__name__}")
+
+def _node_depths(left, right, roots):
+    """Computes every node's depth from the child arrays."""
+    depths = np.zeros(len(left), dtype=np.int32)
+    frontier = np.asarray(roots)
+    while len(frontier):
+        children = np.concatenate([left[frontier], right[frontier]])
+        parents = np.concatenate([frontier, frontier])
+        internal = children >= 0
+        depths[children[internal]] = depths[parents[internal]] + 1
+        frontier = children[internal]
+    return depths
+
+def _average_path_length(n_samples):
+    """Expected isolation-tree path length for leaves holding `n_samples` training rows."""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    many = n_samples > 2
+    lengths[many] = 2.0 * (np.log(n_samples[many] - 1.0) + np.euler_gamma) - 2.0 * (n_samples[many] - 1.0) / n_samples[many]
+    return lengths
+
+def _stack_trees(trees):
+    """Concatenates per-tree node tables into one table with global child indices."""
+    offsets = np.cumsum([0] + [len(tree["feature"]) for tree in trees[:-1]])
+    feature, threshold, left, right, value = [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        feature.append(tree["feature"])
+        threshold.append(tree["threshold"])
+        left.append(np.where(tree["left"] >= 0, tree["left"] + offset, -1))
+        right.append(np.where(tree["right"] >= 0, tree["right"] + offset, -1))
+        value.append(tree["value"])
+    table = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": offsets.astype(np.int32)
+    }
+    return table
+
+def _sklearn_tree(estimator, leaf_value, features=None):
+    tree = estimator.tree_
+    feature = tree.feature.astype(np.int32)
+    if features is not None:
+        feature = np.where(feature >= 0, np.asarray(features)[np.maximum(feature, 0)], -1)
+    return {"feature": np.where(tree.children_left >= 0, feature, -1), "threshold": tree.threshold,
+            "left": tree.children_left, "right": tree.children_right, "value": leaf_value}
+
+def _convert_random_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        counts = estimator.tree_.value[:, 0, :]
+        trees.append(_sklearn_tree(estimator, counts[:, 1] / np.maximum(counts.sum(axis=1), 1e-12)))
+    return {"kind": "forest", "combine": "mean_proba", "classes": np.asarray(model.classes_), **_stack_trees(trees)}
+
+def _convert_isolation_forest(model):
+    trees = []
+    subsampled = len(model.estimators_features_[0]) != model.n_features_in_
+    for estimator, features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        depths = _node_depths(tree.children_left, tree.children_right, [0])
+        leaf_value = depths + _average_path_length(tree.n_node_samples)
+        trees.append(_sklearn_tree(estimator, leaf_value, features if subsampled else None))
+    return {"kind": "forest", "combine": "isolation", "offset": float(model.offset_),
+            "path_norm": float(len(model.estimators_) * _average_path_length([model.max_samples_])[0]),
+            **_stack_trees(trees)}
+
+def _convert_xgboost(model):
+    booster = model.get_booster()
+    feature_names = booster.feature_names
+    trees = []
+    for dump in booster.get_dump(dump_format="json"):
+        nodes, stack = {}, [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node["nodeid"]] = node
+            stack.extend(node.get("children", []))
+        size = max(nodes) + 1
+        tree = {"feature": np.full(size, -1), "threshold": np.zeros(size), "left": np.full(size, -1),
+                "right": np.full(size, -1), "value": np.zeros(size)}
+        for node_id, node in nodes.items():
+            if "leaf" in node:
+                tree["value"][node_id] = node["leaf"]
+                continue
+            split = node["split"]
+            tree["feature"][node_id] = feature_names.index(split) if feature_names else int(split.lstrip("f"))
+            # xgboost sends `x < split` left (float32); that is `x <= largest float32 below split`
+            tree["threshold"][node_id] = np.nextafter(np.float32(node["split_condition"]), np.float32(-np.inf))
+            tree["left"][node_id], tree["right"][node_id] = node["yes"], node["no"]
+        trees.append(tree)
+    return {"kind": "forest", "combine": "sum_margin", "bias": margin_bias(model), **_stack_trees(trees)}
+
+def _convert_lightgbm(model):
+    trees = []
+    for tree_info in model.booster_.dump_model()["tree_info"]:
+        feature, threshold, left, right, value = [], [], [], [], []
+        stack = [(tree_info["tree_structure"], None, None)]
+        while stack:
+            node, parent, is_left = stack.pop()
+            index = len(feature)
+            if parent is not None:
+                (left if is_left else right)[parent] = index
+            if "leaf_value" in node and "split_feature" not in node:
+                feature.append(-1), threshold.append(0.0), value.append(node["leaf_value"])
+                left.append(-1), right.append(-1)
+                continue
+            if node.get("decision_type", "<=") != "<=" or node.get("missing_type") == "Zero":
+                raise ValueError("Only numerical '<=' LightGBM splits without zero-as-missing can be compiled")
+            feature.append(node["split_feature"]), threshold.append(node["threshold"]), value.append(0.0)
+            left.append(-1), right.append(-1)
+            stack.append((node["right_child"], index, False))
+            stack.append((node["left_child"], index, True))
+        trees.append({"feature": np.array(feature), "threshold": np.array(threshold), "left": np.array(left),
+                      "right": np.array(right), "value": np.array(value)})
+    return {"kind": "forest", "combine": "sum_margin", "bias": margin_bias(model), **_stack_trees(trees)}
+
+def _convert_catboost(model, scratch_path):
+    model.save_model(scratch_path, format="json")
+    with open(scratch_path, "r") as f:
+        dump = json.load(f)
+    feature_index = [info["feature_index"] for info in dump["features_info"]["float_features"]]
+    trees = dump["oblivious_trees"]
+    depth = max(len(tree["splits"]) for tree in trees)
+    # Shallower trees are padded with splits that never fire (border +inf), which leaves their leaf index unchanged
+    features = np.zeros((len(trees), depth), dtype=np.int32)
+    borders = np.full((len(trees), depth), np.inf)
+    leaf_values = np.zeros((len(trees), 2 ** depth))
+    for t, tree in enumerate(trees):
+        for d, split in enumerate(tree["splits"]):
+            if split.get("split_type", "FloatFeature") != "FloatFeature":
+                raise ValueError("Only float-feature CatBoost splits can be compiled")
+            features[t, d] = feature_index[split["float_feature_index"]]
+            borders[t, d] = split["border"]
+        leaf_values[t, :len(tree["leaf_values"])] = tree["leaf_values"]
+    scale, bias = dump.get("scale_and_bias", [1.0, [0.0]])
+    return {"kind": "oblivious", "features": features, "borders": borders, "leaf_values": leaf_values,
+            "scale": float(scale), "bias": float(np.ravel(bias)[0])}
+
+def export_mlp(model):
+    """Exports a Keras stack of Dense layers as float32 weight/bias arrays plus activation names."""
+    layers = [layer for layer in model.layers if layer.get_weights()]
+    for layer in layers:
+        if type(layer).__name__ != "Dense" or layer.activation.__name__ not in _ACTIVATIONS:
+            raise ValueError(f"layer {layer.name} is not a Dense layer with a supported activation")
+    return {"kind": "mlp",
+            "weights": [layer.get_weights()[0].astype(np.float32) for layer in layers],
+            "biases": [layer.get_weights()[1].astype(np.float32) for layer in layers],
+            "activations": [layer.activation.__name__ for layer in layers]}
+
+def convert_member(model, scratch_path):
+    """Converts a trained ensemble member into numpy arrays (raises ValueError if it cannot be compiled)."""
+    module = type(model).__module__
+    name = type(model).__name__
+    if module.startswith("xgboost"):
+        return _convert_xgboost(model)
+    if module.startswith("lightgbm"):
+        return _convert_lightgbm(model)
+    if module.startswith("catboost"):
+        return _convert_catboost(model, scratch_path)
+    if name == "RandomForestClassifier":
+        return _convert_random_forest(model)
+    if name == "IsolationForest":
+        return _convert_isolation_forest(model)
+    if isinstance(model, NumpyMLP):
+        return dict(model.member)
+    if hasattr(model, "layers"):
+        return export_mlp(model)
+    raise ValueError(f"Don't know how to compile {module}.{name}")
+
+# 3️⃣ **VECTORIZED EVALUATION**
+def _forest_leaf_values(member, X):
+    """Walks every tree for every row at once and returns the (rows, trees) leaf values.
+
+    Only (row, tree) pairs still sitting on an internal node are advanced, so
+    each pass gets cheaper as shallow branches reach their leaves.
+    """
+    feature, threshold, left, right = member["feature"], member["threshold"], member["left"], member["right"]
+    roots = member["roots"]
+    flat_X = np.ascontiguousarray(X).ravel()
+    node = np.tile(roots, len(X))
+    row_offset = np.repeat(np.arange(len(X)) * X.shape[1], len(roots))
+    active = np.arange(node.size)
+    while active.size:
+        active_node = node[active]
+        active_feature = feature[active_node]
+        internal = active_feature >= 0
+        active, active_node, active_feature = active[internal], active_node[internal], active_feature[internal]
+        go_left = flat_X[row_offset[active] + active_feature] <= threshold[active_node]
+        node[active] = np.where(go_left, left[active_node], right[active_node])
+    return member["value"][node].reshape(len(X), len(roots))
+
+def _predict_forest(member, X):
+    leaves = _forest_leaf_values(member, X)
+    if member["combine"] == "mean_proba":
+        return member["classes"][(leaves.mean(axis=1) > 0.5).astype(np.int64)].astype(np.float64)
+    if member["combine"] == "sum_margin":
+        return (leaves.sum(axis=1) + member["bias"] > 0).astype(np.float64)
+    # isolation: sklearn's predict() from the mean path length
+    scores = -(2.0 ** (-leaves.sum(axis=1) / member["path_norm"]))
+    return np.where(scores - member["offset"] < 0, -1.0, 1.0)
+
+def _predict_oblivious(member, X):
+    features, borders = member["features"], member["borders"]
+    leaf_index = np.zeros((len(X), features.shape[0]), dtype=np.int64)
+    for depth in range(features.shape[1]):
+        leaf_index |= (X[:, features[:, depth]] > borders[:, depth]).astype(np.int64) << depth
+    raw = member["leaf_values"][np.arange(features.shape[0])[None, :], leaf_index].sum(axis=1)
+    return (raw * member["scale"] + member["bias"] > 0).astype(np.float64)
+
+_ACTIVATIONS = {
+    "relu": lambda z: np.maximum(z, 0.0),
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-z)),
+    "tanh": np.tanh,
+    "linear": lambda z: z
+}
+
+def mlp_forward(member, X):
+    """Dense-network forward pass in float32 (matches Keras `predict` for Dense layers)."""
+    activations = X.astype(np.float32)
+    for weights, biases, activation in zip(member["weights"], member["biases"], member["activations"]):
+        activations = _ACTIVATIONS[activation](activations @ weights + biases)
+    return activations[:, 0].astype(np.float64)
+
+class NumpyMLP:
+    """Stand-in for a Keras dense net that scores with `mlp_forward`; `predict` returns Keras' (rows, 1) shape."""
+
+    def __init__(self, member):
+        self.member = member
+
+    def predict(self, X):
+        return mlp_forward(self.member, X)[:, None]
+
+def predict_member(member, X):
+    """Reproduces the member's `predict` output on scaled float32 features."""
+    if member["kind"] == "forest":
+        return _predict_forest(member, X)
+    if member["kind"] == "oblivious":
+        return _predict_oblivious(member, X)
+    return mlp_forward(member, X)
+
+# 4️⃣ **COMPILED ENSEMBLE**
+def save_compiled(target, members, scaler=None, **metadata):
+    """Writes the compiled members (and the feature scaler) as one uncompressed joblib artifact to a path or file object."""
+    artifact = {
+        "format_version": COMPILED_FORMAT_VERSION,
+        "members": members,
+        # float32, like StandardScaler.transform on the float32 features the models were trained on
+        "scaler": {"mean": scaler.mean_.astype(np.float32), "scale": scaler.scale_.astype(np.float32)}
+                  if scaler is not None else None,
+        "metadata": metadata
+    }
+    joblib.dump(artifact, target)
+
+class CompiledEnsemble:
+    """Numpy-only scorer for a compiled ensemble artifact loaded with joblib (memory-mapped by `ai.LazyEnsemble`)."""
+
+    def __init__(self, artifact):
+        if artifact["format_version"] != COMPILED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled artifact format {artifact['format_version']}")
+        self.members = artifact["members"]
+        self.scaler = artifact["scaler"]
+        self.metadata = artifact["metadata"]
+
+    def predict(self, X, chunk_rows=COMPILED_CHUNK_ROWS):
+        """Scores raw (unscaled) features; returns {member: array} with one score per row."""
+        X = np.asarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            raise ValueError("Compiled scoring requires finite feature values")
+        if self.scaler is not None:
+            X = (X - self.scaler["mean"]) / self.scaler["scale"]
+
+        per_model = {name: np.empty(len(X), dtype=np.float64) for name in self.members}
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            for name, member in self.members.items():
+                per_model[name][start:start + len(chunk)] = predict_member(member, chunk)
+        return per_model
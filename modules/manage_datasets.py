@@ -1,6 +1,10 @@
 import os
 import json
 
+# Module manifest (read by core.py without importing this module)
+description = "Dataset Management"
+requires = []
+
 DATASET_CONFIG_FILE = "models/datasets.json"
 
 def load_datasets():
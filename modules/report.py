@@ -10,6 +10,15 @@ from reportlab.lib.utils import ImageReader
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 from reportlab.lib import colors
 
+# Module manifest (read by core.py without importing this module)
+description = "Forensic Report Generation"
+requires = ["pandas", "matplotlib", "reportlab"]
+job_args = {
+    "case_id": "Enter case ID: ",
+    "suspect_name": "Enter suspect name (optional): ",
+    "suspect_image": "Enter suspect image path (optional): "
+}
+
 # 1️⃣ **DIRECTORY SETUP**
 REPORTS_DIR = "reports/"
 VISUALS_DIR = f"{REPORTS_DIR}/visuals/"
@@ -97,8 +106,14 @@ def generate_forensic_report(case_id, suspect_name=None, suspect_image=None):
 
     doc.build(elements)
     print(f"📄 Forensic Intelligence Report saved as {filename}")
+    return filename
 
 # 5️⃣ **RUN REPORT GENERATION**
+def run_job(case_id, suspect_name=None, suspect_image=None):
+    """Generates a forensic report without prompting (used by batch mode)."""
+    report_file = generate_forensic_report(case_id, suspect_name, suspect_image)
+    return {"case_id": case_id, "report": report_file}
+
 def run():
     """Executes the forensic intelligence report generator dynamically."""
     print("🔍 OSINTEL Report Generator is running...")
@@ -0,0 +1,226 @@
+import json
+import time
+import queue
+import threading
+import config
+import requests
+import numpy as np
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Module manifest (read by core.py without importing this module)
+description = "AI Risk Scoring Server (shared, micro-batched)"
+requires = ["numpy", "pandas", "sklearn", "joblib", "requests"]
+
+# 1️⃣ **MICRO-BATCHING**
+REQUEST_TIMEOUT = 30  # seconds a request waits for its batch to be scored
+LISTEN_BACKLOG = 128  # pending connections the socket accepts before resetting new ones
+
+class MicroBatcher:
+    """Gathers concurrent scoring requests into one batch per latency window and scores it in one pass."""
+
+    def __init__(self, score_batch, window_ms, max_batch_size):
+        self.score_batch = score_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rows": 0, "batches": 0, "errors": 0, "abandoned": 0, "max_batch_rows": 0,
+                       "max_queue_depth": 0, "scoring_seconds": 0.0, "last_batch_rows": 0}
+        self._thread = threading.Thread(target=self._loop, name="osintel-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queues a feature matrix; returns a Future resolving to one score per row."""
+        future = Future()
+        self._queue.put((X, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        return future
+
+    def _collect(self, first):
+        """Collects requests until the window closes or the batch is full; returns (batch, stop)."""
+        batch, rows = [first], len(first[0])
+        deadline = time.monotonic() + self.window
+        while rows < self.max_batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item[0])
+        return batch, False
+
+    def _score(self, batch):
+        # Requests whose caller gave up waiting (cancelled futures) are not scored
+        live = [(X, future) for X, future in batch if future.set_running_or_notify_cancel()]
+        if len(live) < len(batch):
+            with self._lock:
+                self._stats["abandoned"] += len(batch) - len(live)
+        batch = live
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            scores = self.score_batch(np.vstack([X for X, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            with self._lock:
+                self._stats["errors"] += 1
+            return
+
+        offset = 0
+        for X, future in batch:
+            future.set_result(scores[offset:offset + len(X)].tolist())
+            offset += len(X)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["rows"] += offset
+            self._stats["last_batch_rows"] = offset
+            self._stats["max_batch_rows"] = max(self._stats["max_batch_rows"], offset)
+            self._stats["scoring_seconds"] += time.perf_counter() - started
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._score(batch)
+
+    def stats(self):
+        """Queue depth, batch sizes and scoring time so far."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mean_batch_rows"] = round(stats["rows"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["scoring_seconds"] = round(stats["scoring_seconds"], 4)
+        return stats
+
+    def close(self):
+        """Scores whatever is already queued, then stops the batching thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+# 2️⃣ **LOCALHOST HTTP API**
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """POST /score with a record or a list of records; GET /stats and GET /health."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse one connection per worker
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.batcher.stats())
+        elif self.path == "/health":
+            from modules import ai
+            self._send_json(200, {"status": "ok", "model_version": ai.AI_MODELS.version})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        from modules import ai
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            X = ai._feature_matrix(payload.get("records", payload) if isinstance(payload, dict) else payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid scoring request: {e}"})
+            return
+        future = self.server.batcher.submit(X)
+        try:
+            scores = future.result(timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            future.cancel()  # still queued: the batcher drops it instead of scoring it for nobody
+            self._send_json(504, {"error": f"Scoring did not finish within {REQUEST_TIMEOUT}s"})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, {"scores": scores})
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown the console under load
+
+def _score_aggregate(X):
+    from modules import ai
+    return ai.score_cybercrime_batch(X)["aggregate"]
+
+class ScoringServer(ThreadingHTTPServer):
+    """Thread-per-connection HTTP server that hands every request to one shared MicroBatcher."""
+
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+def start_scoring_server(host=None, port=None, window_ms=None, max_batch_size=None):
+    """Starts the scoring server in a background thread and returns it (call `stop_scoring_server` to stop).
+
+    The AI stack is imported here, not at module level, so clients that only
+    call `score_remote` never import the AI stack or load the model store.
+    """
+    from modules import ai
+    host = host or config.OSINTELConfig.SCORING_SERVER_HOST
+    port = config.OSINTELConfig.SCORING_SERVER_PORT if port is None else port
+    window_ms = config.OSINTELConfig.SCORING_BATCH_WINDOW_MS if window_ms is None else window_ms
+    max_batch_size = max_batch_size or config.OSINTELConfig.SCORING_MAX_BATCH_SIZE
+
+    ai.warm_up()  # load the model once, before the first request arrives
+    server = ScoringServer((host, port), ScoringRequestHandler)
+    server.batcher = MicroBatcher(_score_aggregate, window_ms, max_batch_size)
+    threading.Thread(target=server.serve_forever, name="osintel-scoring-server", daemon=True).start()
+    return server
+
+def stop_scoring_server(server):
+    """Stops accepting requests, finishes the queued ones and returns the final stats."""
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+    return server.batcher.stats()
+
+# 3️⃣ **CLIENT (FOR OTHER MODULES AND WORKER PROCESSES)**
+_http = threading.local()
+
+def _http_session():
+    """One keep-alive session per client thread (requests.Session is not thread-safe)."""
+    if not hasattr(_http, "session"):
+        _http.session = requests.Session()
+    return _http.session
+
+def score_remote(records, host=None, port=None, timeout=REQUEST_TIMEOUT):
+    """Scores a record or list of records on a running scoring server; returns one risk score per record."""
+    host = host or config.OSINTELConfig.SCORING_SERVER_HOST
+    port = config.OSINTELConfig.SCORING_SERVER_PORT if port is None else port
+    response = _http_session().post(f"http://{host}:{port}/score", json={"records": records}, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"Scoring server returned HTTP {response.status_code}: {response.json().get('error')}")
+    return response.json()["scores"]
+
+# 4️⃣ **RUN SCORING SERVER**
+def run():
+    """Runs the shared scoring server in the foreground until interrupted."""
+    server = start_scoring_server()
+    host, port = server.server_address[:2]
+    print(f"🟢 Scoring server listening on http://{host}:{port} (POST /score, GET /stats). Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    stats = stop_scoring_server(server)
+    print(f"✅ Scoring server stopped after {stats['requests']} requests in {stats['batches']} batches "
+          f"(mean batch {stats['mean_batch_rows']} rows).")
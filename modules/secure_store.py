@@ -0,0 +1,324 @@
+import io
+import os
+import atexit
+import base64
+import hashlib
+import tempfile
+import multiprocessing.util
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no shared plaintext cache (containers are loaded in memory instead)
+    fcntl = None
+
+# 1️⃣ **CONTAINER FORMAT**
+# header | segment 0 | segment 1 | ... | final segment
+#
+# The header holds a magic string, the format version, the plaintext segment
+# size, a random per-file salt and a random nonce prefix. Every segment is
+# AES-256-GCM over at most SEGMENT_SIZE plaintext bytes, with the nonce
+# prefix || segment index || final-segment flag as nonce and the header as
+# associated data (the "STREAM" construction). Segments can therefore be
+# decrypted independently (random access), reordering or truncating them fails
+# authentication, and neither side ever holds more than one segment in memory.
+MAGIC = b"OSINTEL\x00"
+FORMAT_VERSION = 1
+SEGMENT_SIZE = 1 << 20  # plaintext bytes per segment
+SALT_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+HEADER_SIZE = len(MAGIC) + 1 + 4 + SALT_SIZE + NONCE_PREFIX_SIZE
+KDF_INFO = b"osintel secure store v1"
+SHARED_MEMORY_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None  # RAM-backed scratch for mmap loads
+SHARED_PLAINTEXT_PREFIX = "osintel-plain-"
+
+def _file_key(master_key, salt):
+    """Derives the per-file AES-256 key from a Fernet master key and the file's salt."""
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=KDF_INFO)
+    return AESGCM(hkdf.derive(base64.urlsafe_b64decode(master_key)))
+
+def _nonce(prefix, index, final):
+    return prefix + index.to_bytes(4, "big") + (b"\x01" if final else b"\x00")
+
+def is_encrypted(path):
+    """True if the file is a secure-store container."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+# 2️⃣ **STREAMING ENCRYPTION**
+class EncryptedWriter(io.RawIOBase):
+    """Writable file object that encrypts segment by segment into `path` (atomically replaced on close)."""
+
+    def __init__(self, path, master_key, segment_size=SEGMENT_SIZE):
+        super().__init__()
+        self.path = path
+        self.segment_size = segment_size
+        salt, self._prefix = os.urandom(SALT_SIZE), os.urandom(NONCE_PREFIX_SIZE)
+        self._header = MAGIC + bytes([FORMAT_VERSION]) + segment_size.to_bytes(4, "big") + salt + self._prefix
+        self._cipher = _file_key(master_key, salt)
+        self._buffer = bytearray()
+        self._index = 0
+        self._written = 0
+        self._temp_path = f"{path}.tmp"
+        self._file = open(self._temp_path, "wb")
+        self._file.write(self._header)
+
+    def writable(self):
+        return True
+
+    def _emit(self, chunk, final):
+        self._file.write(self._cipher.encrypt(_nonce(self._prefix, self._index, final), bytes(chunk), self._header))
+        self._index += 1
+
+    def tell(self):
+        return self._written  # plaintext position; lets joblib align memory-mappable arrays
+
+    def write(self, data):
+        self._buffer += data
+        self._written += len(data)
+        # keep at least one byte buffered: only close() knows which segment is the final one
+        while len(self._buffer) > self.segment_size:
+            self._emit(self._buffer[:self.segment_size], final=False)
+            del self._buffer[:self.segment_size]
+        return len(data)
+
+    def close(self):
+        """Writes the final segment and moves the container into place."""
+        if self.closed:
+            return
+        self._emit(self._buffer, final=True)
+        self._buffer = bytearray()
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+        super().close()
+
+    def abort(self):
+        """Discards a partially written container."""
+        if not self.closed:
+            self._file.close()
+            os.remove(self._temp_path)
+            super().close()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+def encrypt_file(source_path, target_path, master_key):
+    """Encrypts a file into a container in bounded memory."""
+    with open(source_path, "rb") as source, EncryptedWriter(target_path, master_key) as target:
+        for block in iter(lambda: source.read(SEGMENT_SIZE), b""):
+            target.write(block)
+
+# 3️⃣ **RANDOM-ACCESS DECRYPTION**
+class EncryptedReader(io.RawIOBase):
+    """Seekable read-only view of a container's plaintext; only the segment being read is decrypted."""
+
+    def __init__(self, path, master_key):
+        super().__init__()
+        self._file = open(path, "rb")
+        self._header = self._file.read(HEADER_SIZE)
+        if len(self._header) != HEADER_SIZE or not self._header.startswith(MAGIC):
+            self._file.close()
+            raise ValueError(f"{path} is not an encrypted OSINTEL container")
+        if self._header[len(MAGIC)] != FORMAT_VERSION:
+            self._file.close()
+            raise ValueError(f"{path} uses unsupported container format {self._header[len(MAGIC)]}")
+
+        offset = len(MAGIC) + 1
+        self.segment_size = int.from_bytes(self._header[offset:offset + 4], "big")
+        salt = self._header[offset + 4:offset + 4 + SALT_SIZE]
+        self._prefix = self._header[offset + 4 + SALT_SIZE:]
+        self._cipher = _file_key(master_key, salt)
+        self.path = path
+
+        body = os.fstat(self._file.fileno()).st_size - HEADER_SIZE
+        stored_segment = self.segment_size + TAG_SIZE
+        self._segments = max((body + stored_segment - 1) // stored_segment, 1)
+        self.size = body - self._segments * TAG_SIZE
+        if self.size < 0:
+            self._file.close()
+            raise ValueError(f"{path} is truncated")
+        self._position = 0
+        self._cached_index, self._cached = None, b""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def _segment(self, index):
+        if index != self._cached_index:
+            stored_segment = self.segment_size + TAG_SIZE
+            self._file.seek(HEADER_SIZE + index * stored_segment)
+            final = index == self._segments - 1
+            try:
+                self._cached = self._cipher.decrypt(_nonce(self._prefix, index, final),
+                                                    self._file.read(stored_segment), self._header)
+            except InvalidTag:
+                raise ValueError(f"{self.path} failed authentication at segment {index} (tampered, truncated or wrong key)")
+            self._cached_index = index
+        return self._cached
+
+    def readinto(self, buffer):
+        if self._position >= self.size:
+            return 0
+        index, offset = divmod(self._position, self.segment_size)
+        segment = self._segment(index)
+        count = min(len(buffer), len(segment) - offset)
+        buffer[:count] = segment[offset:offset + count]
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+def open_encrypted(path, master_key):
+    """Opens a container for buffered, seekable reading (usable by pickle/joblib, pyarrow and friends)."""
+    return io.BufferedReader(EncryptedReader(path, master_key), buffer_size=SEGMENT_SIZE)
+
+def decrypt_file(source_path, target_path, master_key):
+    """Decrypts a container to a plain file in bounded memory."""
+    with EncryptedReader(source_path, master_key) as source, open(target_path, "wb") as target:
+        for block in iter(lambda: source.read(SEGMENT_SIZE), b""):
+            target.write(block)
+
+def decrypt_to_temp(path, master_key, suffix=""):
+    """Decrypts a container into a private RAM-backed temp file (for loaders that need a path or mmap).
+
+    The caller removes the file once it is loaded; on POSIX, memory maps of it
+    stay valid after removal. Raises RuntimeError where there is no RAM-backed
+    storage: plaintext is never written to disk.
+    """
+    if SHARED_MEMORY_DIR is None:
+        raise RuntimeError("No RAM-backed storage (/dev/shm) for decrypted data; refusing to write plaintext to disk")
+    fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=SHARED_MEMORY_DIR)
+    os.close(fd)
+    try:
+        decrypt_file(path, temp_path, master_key)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+# 4️⃣ **SHARED PLAINTEXT CACHE (ONE COPY FOR ALL PROCESSES)**
+# Memory-mapped loads need a plaintext file. Every process that maps the same
+# container shares one decrypted copy in RAM-backed storage, so its pages are
+# shared too. Each user holds a shared flock on the copy (the reference count)
+# until it releases it, at the latest when it exits; the last one to release
+# deletes the copy. Copies left by a killed process are deleted by the next
+# acquire or release. Creation and deletion are serialised by an flock on the
+# storage directory itself, so no lock files are left behind.
+_shared_handles = {}
+_release_registered_pid = None
+
+class _DirectoryLock:
+    """Exclusive flock on the RAM-backed storage directory."""
+
+    def __enter__(self):
+        self._fd = os.open(SHARED_MEMORY_DIR, os.O_RDONLY)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self._fd)  # closing the descriptor releases the flock
+
+def _shared_plaintext_path(path, suffix):
+    stat = os.stat(path)
+    identity = f"{os.path.realpath(path)}:{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+    cache_key = hashlib.sha256(identity.encode()).hexdigest()[:32]  # containers are replaced, never rewritten in place
+    return os.path.join(SHARED_MEMORY_DIR, f"{SHARED_PLAINTEXT_PREFIX}{cache_key}{suffix}")
+
+def _prune_unheld():
+    """Deletes copies no process holds; the caller holds the directory lock."""
+    removed = 0
+    for name in os.listdir(SHARED_MEMORY_DIR):
+        if not name.startswith(SHARED_PLAINTEXT_PREFIX):
+            continue
+        target = os.path.join(SHARED_MEMORY_DIR, name)
+        try:
+            with open(target, "rb") as copy:
+                fcntl.flock(copy, fcntl.LOCK_EX | fcntl.LOCK_NB)  # fails while any process holds it
+                os.remove(target)
+                removed += 1
+        except (BlockingIOError, FileNotFoundError):
+            continue
+    return removed
+
+def release_shared_plaintext(target=None):
+    """Drops this process's hold on one shared copy (or all of them); copies nobody holds any more are deleted.
+
+    Memory maps already made from a released copy stay valid.
+    """
+    if fcntl is None or SHARED_MEMORY_DIR is None:
+        return 0
+    with _DirectoryLock():
+        for held in ([target] if target is not None else list(_shared_handles)):
+            handle = _shared_handles.pop(held, None)
+            if handle is not None:
+                handle.close()
+        return _prune_unheld()
+
+def _forget_inherited_handles():
+    # A forked child shares its parent's locks; dropping its copies of the descriptors leaves the
+    # reference count to the parent (the child's maps stay valid) and the child acquires its own.
+    global _release_registered_pid
+    for handle in _shared_handles.values():
+        handle.close()
+    _shared_handles.clear()
+    _release_registered_pid = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited_handles)
+
+def _release_at_exit():
+    # atexit does not run in forked multiprocessing children, but multiprocessing's exit finalizers do
+    global _release_registered_pid
+    if _release_registered_pid != os.getpid():
+        atexit.register(release_shared_plaintext)
+        multiprocessing.util.Finalize(None, release_shared_plaintext, exitpriority=0)
+        _release_registered_pid = os.getpid()
+
+def shared_plaintext(path, master_key, suffix=""):
+    """Returns the path of a decrypted copy of a container shared by every process (decrypted once, kept while held).
+
+    The copy stays valid until `release_shared_plaintext` (called at exit); safe
+    to memory-map. Returns None where there is no RAM-backed storage or no flock
+    (e.g. Windows): load the container in memory with `open_encrypted` instead.
+    """
+    if fcntl is None or SHARED_MEMORY_DIR is None:
+        return None
+    target = _shared_plaintext_path(path, suffix)
+    if target in _shared_handles:
+        return target
+    _release_at_exit()
+    with _DirectoryLock():
+        _prune_unheld()
+        if not os.path.exists(target):
+            temp_path = decrypt_to_temp(path, master_key, suffix=suffix)
+            os.replace(temp_path, target)
+        handle = open(target, "rb")
+        fcntl.flock(handle, fcntl.LOCK_SH)
+    _shared_handles[target] = handle
+    return target
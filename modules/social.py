@@ -1,11 +1,16 @@
 import requests
 import time
-import json
 import threading
 import config
+import numpy as np
 from datetime import datetime
 from reportlab.pdfgen import canvas
-from sklearn.ensemble import IsolationForest
+from modules import anomaly
+
+# Module manifest (read by core.py without importing this module)
+description = "Social Media OSINT"
+requires = ["requests", "reportlab", "sklearn", "numpy", "joblib"]
+job_args = {"username": "Enter the username to track: "}
 
 # 1️⃣ **Social Media Platforms to Track**
 SOCIAL_MEDIA_PLATFORMS = {
@@ -39,16 +44,14 @@ def monitor_social_media(username):
     return findings
 
 # 3️⃣ **AI-Based Social Behavior Analysis**
-def ai_social_behavior_analysis(findings):
-    """Uses AI to assess user influence & engagement trends."""
-    model = IsolationForest(n_estimators=100, contamination=0.1)
-    data = [{"Influence_Score": 1 if "✅" in value else 0} for key, value in findings.items()]
-    df = json.dumps(data)
+def social_features(findings):
+    """One numeric row per platform: profile found, lookup error."""
+    rows = [[1.0 if "✅" in value else 0.0, 1.0 if value.startswith("⚠️ Error") else 0.0] for value in findings.values()]
+    return np.array(rows, dtype=np.float64).reshape(-1, len(anomaly.DOMAIN_FEATURES["social"]))
 
-    model.fit([[entry["Influence_Score"]] for entry in json.loads(df)])
-    influence_scores = model.predict([[entry["Influence_Score"]] for entry in json.loads(df)])
-
-    influence_level = sum(influence_scores) / len(influence_scores)
+def ai_social_behavior_analysis(findings):
+    """Uses AI to assess user influence & engagement trends (shared, pre-fitted anomaly model)."""
+    influence_level = anomaly.get_anomaly_scorer("social").risk_level(social_features(findings))
 
     if influence_level < -0.3:
         print("🚨 HIGH-INFLUENCE SOCIAL MEDIA PRESENCE DETECTED!")
@@ -76,6 +79,7 @@ def generate_social_media_report(username, findings, influence_score):
 
     c.save()
     print(f"📄 Social Media Intelligence Report saved as {filename}")
+    return filename
 
 # 5️⃣ **Real-Time Alerts Using Telegram (If Enabled)**
 def send_telegram_alert(message):
@@ -88,18 +92,26 @@ def send_telegram_alert(message):
         print("⚠️ Telegram alerts are disabled. Configure in `config.json` if needed.")
 
 # 6️⃣ **Social Media OSINT Execution**
-def run():
-    """Executes the social media intelligence module."""
-    username = input("Enter the username to track: ")
-    
+def warm_up():
+    """Loads the pre-fitted anomaly model once per process so runs score without touching disk."""
+    return anomaly.get_anomaly_scorer("social")
+
+def run_job(username):
+    """Runs the social media intelligence pipeline for one username without prompting (used by batch mode)."""
     findings = monitor_social_media(username)
     influence_score = ai_social_behavior_analysis(findings)
-    generate_social_media_report(username, findings, influence_score)
+    report_file = generate_social_media_report(username, findings, influence_score)
 
     # Send Telegram Alerts if high-influence user detected
     if influence_score < -0.3:
         send_telegram_alert(f"🚨 HIGH-INFLUENCE SOCIAL MEDIA PROFILE DETECTED!\nUser: {username}")
 
+    return {"username": username, "findings": findings, "influence_score": influence_score, "report": report_file}
+
+def run():
+    """Executes the social media intelligence module."""
+    username = input("Enter the username to track: ")
+    run_job(username)
     print("✅ Social Media OSINT completed.")
 
 if __name__ == "__main__":
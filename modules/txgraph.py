@@ -0,0 +1,188 @@
+import threading
+import numpy as np
+from array import array
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from modules import chain_store
+
+# 1️⃣ **GRAPH LAYOUT**
+# One node per address and per transaction. Funds flow address → transaction
+# (the address's input value) and transaction → address (the output value), so
+# one "address hop" is two graph steps. Edges are held twice as CSR arrays:
+# `out_*` indexed by source node (fan-out) and `in_*` by target node (fan-in).
+TRACE_HOPS = 3  # address hops followed by default
+TAINT_THRESHOLD = 0.01  # taint fractions below this are not reported
+
+_graphs = {}  # currency -> (store revision, TransactionGraph)
+_graphs_lock = threading.Lock()
+
+def _csr(sources, targets, values, node_count):
+    """Sorts an edge list into CSR arrays (indptr, indices, values) keyed by `sources`."""
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    return indptr, targets[order], values[order]
+
+def _neighbours(indptr, indices, nodes):
+    """All neighbours of `nodes` in one vectorized gather."""
+    starts, counts = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=indices.dtype)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return indices[np.repeat(starts, counts) + offsets]
+
+# 2️⃣ **TRANSACTION GRAPH**
+class TransactionGraph:
+    """Address/transaction flow graph in CSR numpy arrays, built from the chain store."""
+
+    def __init__(self, names, is_tx, sources, targets, values, ids=None):
+        self.names = names
+        self.ids = ids if ids is not None else {name: node for node, name in enumerate(names)}
+        self.is_tx = is_tx
+        self.edge_sources, self.edge_targets, self.edge_values = sources, targets, values
+        node_count = len(names)
+        self.out_indptr, self.out_indices, self.out_values = _csr(sources, targets, values, node_count)
+        self.in_indptr, self.in_indices, self.in_values = _csr(targets, sources, values, node_count)
+        self._clusters = None
+
+    @classmethod
+    def from_store(cls, currency):
+        """Builds the graph of every transaction ingested for `currency` (each transaction counted once).
+
+        Address nodes are keyed by `chain_store.normalize_address`, so `0x…` and
+        bare Ethereum addresses are the same node; `names` keeps the stored form.
+        """
+        ids, names, kinds = {}, [], array("b")
+        sources, targets, values = array("q"), array("q"), array("d")
+
+        def node(name, kind):
+            key = chain_store.normalize_address(name) if kind == 0 else name
+            if key not in ids:
+                ids[key] = len(names)
+                names.append(name)
+                kinds.append(kind)
+            return ids[key]
+
+        seen = set()
+        for tx in chain_store.iter_transactions(currency):
+            if tx["hash"] in seen:
+                continue
+            seen.add(tx["hash"])
+            tx_node = node(tx["hash"], 1)
+            for side, edges in (("inputs", tx["inputs"]), ("outputs", tx["outputs"])):
+                for edge in edges:
+                    share = edge["value"] / len(edge["addresses"]) if edge["addresses"] else 0
+                    for address in edge["addresses"]:
+                        address_node = node(address, 0)
+                        sources.append(address_node if side == "inputs" else tx_node)
+                        targets.append(tx_node if side == "inputs" else address_node)
+                        values.append(share)
+
+        return cls(names, np.frombuffer(kinds, dtype=np.int8).astype(bool), np.frombuffer(sources, dtype=np.int64),
+                   np.frombuffer(targets, dtype=np.int64), np.frombuffer(values, dtype=np.float64), ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_sources)
+
+    def _address_nodes(self, addresses):
+        keys = [chain_store.normalize_address(a) for a in addresses]
+        return np.array([self.ids[k] for k in keys if k in self.ids and not self.is_tx[self.ids[k]]], dtype=np.int64)
+
+    # 3️⃣ **K-HOP FAN-OUT / FAN-IN**
+    def trace(self, address, hops=TRACE_HOPS, direction="out"):
+        """Addresses reachable from `address` within `hops` address hops, following funds forward
+        ("out") or backward ("in"); returns {address: hop}."""
+        indptr, indices = (self.out_indptr, self.out_indices) if direction == "out" else (self.in_indptr, self.in_indices)
+        frontier = self._address_nodes([address])
+        if not len(frontier):
+            return {}
+        distance = np.full(len(self.names), -1, dtype=np.int32)
+        distance[frontier] = 0
+        for hop in range(1, hops + 1):
+            frontier = np.unique(_neighbours(indptr, indices, _neighbours(indptr, indices, frontier)))
+            frontier = frontier[distance[frontier] < 0]
+            if not len(frontier):
+                break
+            distance[frontier] = hop
+        reached = np.flatnonzero(distance > 0)
+        return {self.names[node]: int(distance[node]) for node in reached}
+
+    # 4️⃣ **TAINT PROPAGATION (HAIRCUT)**
+    def taint(self, sources, hops=TRACE_HOPS, threshold=TAINT_THRESHOLD):
+        """Share of each address's received funds that can be traced back to `sources` within `hops` hops.
+
+        A transaction's taint is the value-weighted taint of its inputs; an
+        address's taint is the value-weighted taint of the outputs it received.
+        Returns {address: fraction} for fractions >= `threshold` (sources excluded).
+        """
+        node_count = len(self.names)
+        source_nodes = self._address_nodes(sources)
+        taint = np.zeros(node_count)
+        taint[source_nodes] = 1.0
+
+        inputs = ~self.is_tx[self.edge_sources]  # address → transaction edges
+        in_src, in_dst, in_val = self.edge_sources[inputs], self.edge_targets[inputs], self.edge_values[inputs]
+        out_src, out_dst, out_val = self.edge_sources[~inputs], self.edge_targets[~inputs], self.edge_values[~inputs]
+        tx_input_value = np.bincount(in_dst, weights=in_val, minlength=node_count)
+        address_received = np.bincount(out_dst, weights=out_val, minlength=node_count)
+
+        for _ in range(hops):
+            tx_taint = np.divide(np.bincount(in_dst, weights=in_val * taint[in_src], minlength=node_count),
+                                 tx_input_value, out=np.zeros(node_count), where=tx_input_value > 0)
+            received = np.divide(np.bincount(out_dst, weights=out_val * tx_taint[out_src], minlength=node_count),
+                                 address_received, out=np.zeros(node_count), where=address_received > 0)
+            taint = np.maximum(taint, received)
+            taint[source_nodes] = 1.0
+
+        taint[source_nodes] = 0.0
+        tainted = np.flatnonzero((taint >= threshold) & ~self.is_tx)
+        return {self.names[node]: round(float(taint[node]), 4) for node in tainted[np.argsort(-taint[tainted])]}
+
+    # 5️⃣ **COMMON-INPUT CLUSTERING**
+    def clusters(self):
+        """Cluster label per node: addresses spent together as inputs of one transaction share a label."""
+        if self._clusters is None:
+            inputs = ~self.is_tx[self.edge_sources]
+            node_count = len(self.names)
+            adjacency = csr_matrix((np.ones(int(inputs.sum()), dtype=np.int8),
+                                    (self.edge_sources[inputs], self.edge_targets[inputs])), shape=(node_count, node_count))
+            self._clusters = connected_components(adjacency, directed=False)[1]
+        return self._clusters
+
+    def cluster_of(self, address):
+        """Addresses assumed to belong to the same owner as `address` (common-input heuristic)."""
+        nodes = self._address_nodes([address])
+        if not len(nodes):
+            return []
+        labels = self.clusters()
+        members = np.flatnonzero((labels == labels[nodes[0]]) & ~self.is_tx)
+        return [self.names[node] for node in members]
+
+    def summarize(self, address, hops=TRACE_HOPS, top=5):
+        """Tracing findings for one address, as shown in the crypto report."""
+        fan_out = self.trace(address, hops, "out")
+        fan_in = self.trace(address, hops, "in")
+        tainted = self.taint([address], hops)
+        cluster = self.cluster_of(address)
+        return {
+            "Graph Size": f"{int((~self.is_tx).sum())} addresses, {int(self.is_tx.sum())} transactions, {self.edge_count} edges",
+            f"Fan-Out ({hops} hops)": len(fan_out),
+            f"Fan-In ({hops} hops)": len(fan_in),
+            "Cluster Size": len(cluster),
+            "Top Tainted Addresses": [f"{a} ({share:.0%})" for a, share in list(tainted.items())[:top]]
+        }
+
+# 6️⃣ **GRAPH CACHE (REBUILT ONLY WHEN THE STORE CHANGES)**
+def load_graph(currency):
+    """The currency's graph, rebuilt from the store only when its revision moved since the last build."""
+    revision = chain_store.store_revision(currency)  # read first: a concurrent write only causes one extra rebuild
+    with _graphs_lock:
+        cached = _graphs.get(currency)
+        if cached is None or cached[0] != revision:
+            cached = _graphs[currency] = (revision, TransactionGraph.from_store(currency))
+    return cached[1]
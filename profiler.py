@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 1️⃣ **MEMORY SAMPLING**
+def peak_rss_kb():
+    """Returns the process peak resident set size in KB (None where the platform cannot report it)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes, Linux KB
+
+# 2️⃣ **PHASE PROFILER (CHROME TRACE EVENT FORMAT)**
+class Profiler:
+    """Records wall time, peak RSS and import cost per startup phase as a Chrome/Perfetto trace."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._origin = time.perf_counter()
+        self._original_import = None
+
+    def enable(self, trace_imports=True):
+        """Starts recording; optionally traces every first-time import as a nested trace event."""
+        self.enabled = True
+        self._origin = time.perf_counter()
+        if trace_imports and self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._traced_import
+
+    def disable(self):
+        """Stops recording and restores the original import machinery."""
+        self.enabled = False
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timestamp_us(self, moment):
+        return round((moment - self._origin) * 1_000_000, 1)
+
+    def _record(self, name, category, started, args):
+        ended = time.perf_counter()
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._timestamp_us(started),
+            "dur": round((ended - started) * 1_000_000, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args
+        })
+
+    def _traced_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._record(f"import {name}", "import", started, {})
+
+    @contextmanager
+    def phase(self, name, category="phase"):
+        """Times a block, recording wall time, peak RSS and the modules it imported."""
+        if not self.enabled:
+            yield
+            return
+
+        modules_before = set(sys.modules)
+        rss_before = peak_rss_kb()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            rss_after = peak_rss_kb()
+            new_modules = set(sys.modules) - modules_before
+            self._record(name, category, started, {
+                "peak_rss_kb": rss_after,
+                "peak_rss_growth_kb": rss_after - rss_before if rss_after is not None else None,
+                "modules_imported": len(new_modules),
+                "top_level_packages": sorted({module.split(".")[0] for module in new_modules})
+            })
+            if rss_after is not None:
+                self.events.append({"name": "peak_rss_kb", "ph": "C", "ts": self._timestamp_us(time.perf_counter()),
+                                    "pid": os.getpid(), "args": {"peak_rss_kb": rss_after}})
+
+    def write_trace(self, path):
+        """Writes the recorded events as a Chrome trace JSON file (open in Perfetto, chrome://tracing or speedscope)."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        print(f"📈 Startup profile written to {path} ({len(self.events)} events)")
+
+PROFILER = Profiler()
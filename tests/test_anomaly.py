@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from modules import anomaly
+
+# Expected prediction (+1 normal, -1 anomalous) of the reference-profile model for each finding pattern.
+# The alert conditions (found profiles, darknet threats, high-volume wallets) must be the anomalous rows.
+PATTERNS = {
+    "social": [
+        ([0, 0], 1),  # profile not found
+        ([0, 1], 1),  # lookup error
+        ([1, 0], -1)  # profile found
+    ],
+    "darknet": [
+        ([0, 0, 0], 1),  # nothing found
+        ([0, 1, 0], 1),  # site error
+        ([1, 0, np.log1p(1)], -1),  # threat, one mention
+        ([1, 0, np.log1p(12)], -1)  # threat, many mentions
+    ],
+    "crypto": [
+        ([0, 0, 0, 0], 1),  # no activity on the chain
+        ([1, np.log1p(7), np.log1p(0.4), np.log1p(0.25)], 1),  # typical wallet
+        ([1, np.log1p(50000), np.log1p(5000), np.log1p(4900)], -1)  # high-volume wallet
+    ]
+}
+
+@pytest.mark.parametrize("domain", sorted(PATTERNS))
+def test_reference_profile_keeps_alert_intent(domain):
+    model = anomaly.fit_anomaly_model(domain)
+    rows = np.array([row for row, _ in PATTERNS[domain]], dtype=np.float64)
+    assert model.predict(rows).tolist() == [expected for _, expected in PATTERNS[domain]]
+
+def test_reference_profile_is_deterministic():
+    for domain in anomaly.DOMAIN_FEATURES:
+        assert np.array_equal(anomaly.reference_profile(domain), anomaly.reference_profile(domain))
@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import parse_qs, urlparse
+import pytest
+import config
+from modules import chain_store, crypto
+
+ADDRESS = "1TestWallet"
+
+class FakeBlockCypher:
+    """`/addrs/{address}/full` with only the documented cursors: before, after, limit and confirmations."""
+
+    def __init__(self, txs):
+        self.txs = txs
+        self.calls = 0
+
+    def __call__(self, url):
+        self.calls += 1
+        query = {key: int(value[0]) for key, value in parse_qs(urlparse(url).query).items() if key != "token"}
+        txs = [tx for tx in self.txs if tx["block_height"] < 0 or tx["block_height"] > query.get("after", -1)]
+        if "before" in query:
+            txs = [tx for tx in txs if 0 <= tx["block_height"] < query["before"]]
+        if query.get("confirmations"):
+            txs = [tx for tx in txs if tx["block_height"] >= 0]
+        txs.sort(key=lambda tx: (tx["block_height"] >= 0, -tx["block_height"]))
+        page = {"txs": txs[:query["limit"]], "hasMore": len(txs) > query["limit"], "n_tx": len(self.txs),
+                "total_received": 0, "total_sent": 0}
+        return type("Response", (), {"status_code": 200, "json": lambda self: page})()
+
+def transaction(name, height):
+    return {"hash": name, "block_height": height, "inputs": [{"addresses": ["other"], "output_value": 7}],
+            "outputs": [{"addresses": [ADDRESS], "value": 7}]}
+
+def blocks(*sizes, first=1000):
+    return [transaction(f"b{first + b}-{i}", first + b) for b, size in enumerate(sizes) for i in range(size)]
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(chain_store, "CHAIN_STORE_FILE", str(tmp_path / "chain_store.db"))
+    monkeypatch.setattr(chain_store, "_local", threading.local())
+    monkeypatch.setattr(config, "get_config", lambda: {})
+    monkeypatch.setitem(crypto.BLOCKCHAIN_API_URLS, "Bitcoin", "https://api.test/addrs/{}/full?token={}")
+    fake = FakeBlockCypher([])
+    monkeypatch.setattr(crypto, "_blockchain_get", fake)
+    return fake
+
+def ingest(max_pages=crypto.MAX_PAGES_PER_REFRESH):
+    crypto.ingest_wallet("Bitcoin", ADDRESS, chain_store.get_address("Bitcoin", ADDRESS), max_pages)
+    return chain_store.get_address("Bitcoin", ADDRESS)
+
+def test_walk_stores_every_transaction_across_pages(api):
+    api.txs = blocks(*[7] * 40) + [transaction(f"u{i}", -1) for i in range(10)]
+    entry = ingest()
+    assert entry["stored_txs"] == len(api.txs)
+    assert entry["resume_before"] is None and entry["last_block_height"] == 1039
+    assert chain_store.is_fresh(entry)
+
+def test_unconfirmed_backlog_larger_than_a_page_does_not_hide_history(api):
+    api.txs = [transaction(f"u{i}", -1) for i in range(70)] + blocks(*[20] * 10)
+    entry = ingest()
+    assert entry["stored_txs"] == crypto.TX_PAGE_SIZE + 200
+    assert entry["last_block_height"] == 1009 and not entry["resume_stalled"]
+
+def test_walk_cut_short_resumes_from_its_cursor(api):
+    api.txs = blocks(*[30] * 10)
+    entry = ingest(max_pages=1)
+    assert entry["resume_before"] is not None and entry["last_block_height"] is None
+    assert not chain_store.is_fresh(entry)
+    for _ in range(20):
+        entry = ingest(max_pages=1)
+        if entry["resume_before"] is None:
+            break
+    assert entry["stored_txs"] == 300 and entry["last_block_height"] == 1009
+
+def test_block_larger_than_a_page_stalls_instead_of_looping(api):
+    api.txs = blocks(10, 120, 10)
+    entry = ingest()
+    assert api.calls <= 3
+    assert entry["resume_stalled"] and entry["resume_before"] == 1002
+    assert entry["last_block_height"] == 1002 and chain_store.is_fresh(entry)
+
+    api.txs += blocks(5, first=1003)
+    calls = api.calls
+    entry = ingest()
+    assert api.calls - calls == 1  # a stalled walk restarts from the newest block, not the stall point
+    assert entry["stored_txs"] == 10 + crypto.TX_PAGE_SIZE + 5 and entry["last_block_height"] == 1003
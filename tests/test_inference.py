@@ -0,0 +1,90 @@
+import io
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from modules import inference
+
+ROWS = 3000
+
+def xgboost_member():
+    xgb = pytest.importorskip("xgboost")
+    return xgb.XGBClassifier(n_estimators=30, max_depth=4, eval_metric="logloss", n_jobs=1)
+
+def lightgbm_member():
+    lgb = pytest.importorskip("lightgbm")
+    return lgb.LGBMClassifier(n_estimators=30, n_jobs=1, verbose=-1)
+
+def catboost_member():
+    cat = pytest.importorskip("catboost")
+    return cat.CatBoostClassifier(iterations=30, depth=4, verbose=0, thread_count=1, allow_writing_files=False)
+
+def neural_net_member():
+    tf = pytest.importorskip("tensorflow")
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(3,)),
+        tf.keras.layers.Dense(16, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid")
+    ])
+    model.compile(optimizer="adam", loss="binary_crossentropy")
+    return model
+
+# The members of ai.ENSEMBLE_MEMBERS, small enough to train in a test
+MEMBERS = {
+    "xgboost": xgboost_member,
+    "lightgbm": lightgbm_member,
+    "catboost": catboost_member,
+    "random_forest": lambda: RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1),
+    "isolation_forest": lambda: IsolationForest(n_estimators=50, contamination=0.1, random_state=0),
+    "neural_net": neural_net_member
+}
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((ROWS, 3)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + 0.3 * rng.standard_normal(ROWS) > 0).astype(np.int8)
+    return X, y
+
+def fit(name, X, y):
+    model = MEMBERS[name]()
+    if name == "neural_net":
+        model.fit(X, y, epochs=2, batch_size=256, verbose=0)
+    elif name == "isolation_forest":
+        model.fit(X)
+    else:
+        model.fit(X, y)
+    return model
+
+def original_predictions(model, X):
+    if hasattr(model, "layers"):
+        return model.predict(X, batch_size=len(X), verbose=0)[:, 0].astype(np.float64)
+    return np.asarray(model.predict(X), dtype=np.float64)
+
+@pytest.mark.parametrize("name", sorted(MEMBERS))
+def test_compiled_member_matches_original(name, data, tmp_path):
+    X, y = data
+    model = fit(name, X, y)
+    member = inference.convert_member(model, str(tmp_path / f"{name}.json"))
+    compiled = inference.predict_member(member, X)
+    reference = original_predictions(model, X)
+    if member["kind"] == "mlp":
+        np.testing.assert_allclose(compiled, reference, atol=1e-5)
+    else:
+        assert np.array_equal(compiled, reference)
+
+def test_compiled_ensemble_scales_raw_features(data):
+    X, y = data
+    raw = X * np.float32(40) + np.float32(7)
+    scaler = StandardScaler().fit(raw)
+    scaled = scaler.transform(raw).astype(np.float32)
+    models = {name: fit(name, scaled, y) for name in ("random_forest", "isolation_forest")}
+    members = {name: inference.convert_member(model, None) for name, model in models.items()}
+
+    target = io.BytesIO()
+    inference.save_compiled(target, members, scaler)
+    target.seek(0)
+    per_model = inference.CompiledEnsemble(joblib.load(target)).predict(raw, chunk_rows=700)
+    for name, model in models.items():
+        assert np.mean(per_model[name] != original_predictions(model, scaled)) <= 1e-3
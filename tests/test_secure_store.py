@@ -0,0 +1,83 @@
+import os
+import base64
+import pytest
+from modules import secure_store
+
+SEGMENT = 64  # small segments, so a few hundred bytes span several of them
+PLAINTEXT = os.urandom(10 * SEGMENT + 17)
+
+@pytest.fixture
+def key():
+    return base64.urlsafe_b64encode(os.urandom(32))
+
+@pytest.fixture
+def container(tmp_path, key):
+    path = str(tmp_path / "data.enc")
+    with secure_store.EncryptedWriter(path, key, segment_size=SEGMENT) as f:
+        f.write(PLAINTEXT)
+    return path
+
+def read_all(path, key):
+    with secure_store.open_encrypted(path, key) as f:
+        return f.read()
+
+@pytest.mark.parametrize("size", [0, 1, SEGMENT - 1, SEGMENT, SEGMENT + 1, 3 * SEGMENT])
+def test_round_trip(tmp_path, key, size):
+    path = str(tmp_path / "data.enc")
+    plaintext = os.urandom(size)
+    with secure_store.EncryptedWriter(path, key, segment_size=SEGMENT) as f:
+        f.write(plaintext)
+    assert secure_store.is_encrypted(path)
+    assert read_all(path, key) == plaintext
+    assert not os.path.exists(f"{path}.tmp")
+
+def test_random_access_reads_any_range(container, key):
+    with secure_store.open_encrypted(container, key) as f:
+        for start in (0, SEGMENT - 3, 5 * SEGMENT, len(PLAINTEXT) - 4):
+            f.seek(start)
+            assert f.read(2 * SEGMENT) == PLAINTEXT[start:start + 2 * SEGMENT]
+
+def test_failed_write_leaves_nothing(tmp_path, key):
+    path = str(tmp_path / "data.enc")
+    with pytest.raises(RuntimeError):
+        with secure_store.EncryptedWriter(path, key, segment_size=SEGMENT) as f:
+            f.write(PLAINTEXT)
+            raise RuntimeError("interrupted")
+    assert os.listdir(tmp_path) == []
+
+@pytest.mark.parametrize("offset", [secure_store.HEADER_SIZE - 1, secure_store.HEADER_SIZE + 3, -1])
+def test_tampered_byte_is_rejected(container, key, offset):
+    with open(container, "r+b") as f:
+        f.seek(offset, os.SEEK_END if offset < 0 else os.SEEK_SET)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 1]))
+    with pytest.raises(ValueError):
+        read_all(container, key)
+
+@pytest.mark.parametrize("cut", [1, SEGMENT + secure_store.TAG_SIZE])  # mid-segment and a whole final segment
+def test_truncated_container_is_rejected(container, key, cut):
+    os.truncate(container, os.path.getsize(container) - cut)
+    with pytest.raises(ValueError):
+        read_all(container, key)
+
+def test_wrong_key_is_rejected(container):
+    with pytest.raises(ValueError):
+        read_all(container, base64.urlsafe_b64encode(os.urandom(32)))
+
+@pytest.mark.skipif(secure_store.SHARED_MEMORY_DIR is None or secure_store.fcntl is None,
+                    reason="no RAM-backed storage")
+def test_shared_plaintext_is_deleted_on_release(container, key):
+    shared = secure_store.shared_plaintext(container, key)
+    assert shared.startswith(secure_store.SHARED_MEMORY_DIR)
+    assert secure_store.shared_plaintext(container, key) == shared
+    with open(shared, "rb") as f:
+        assert f.read() == PLAINTEXT
+    secure_store.release_shared_plaintext(shared)
+    assert not os.path.exists(shared)
+
+def test_no_plaintext_on_disk_without_ram_storage(container, key, monkeypatch):
+    monkeypatch.setattr(secure_store, "SHARED_MEMORY_DIR", None)
+    assert secure_store.shared_plaintext(container, key) is None
+    with pytest.raises(RuntimeError):
+        secure_store.decrypt_to_temp(container, key)
@@ -0,0 +1,101 @@
+import time
+import atexit
+import importlib
+import threading
+import traceback
+import multiprocessing
+
+# 1️⃣ **WORKER PROCESS LOOP**
+def _worker_main(module_name, conn):
+    """Imports a module once, warms it up and then serves `run_job` requests over a pipe until told to stop."""
+    started = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+        if hasattr(module, "warm_up"):
+            module.warm_up()
+    except Exception as e:
+        conn.send({"status": "error", "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()})
+        conn.close()
+        return
+    conn.send({"status": "ready", "warm_up_seconds": round(time.perf_counter() - started, 4)})
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        started = time.perf_counter()
+        try:
+            response = {"status": "ok", "result": module.run_job(**job)}
+        except Exception as e:
+            response = {"status": "error", "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+        response["elapsed_seconds"] = round(time.perf_counter() - started, 4)
+        conn.send(response)
+
+    conn.close()
+
+# 2️⃣ **WARM WORKER POOL**
+class WarmWorkerPool:
+    """Keeps one long-lived process per module so loaded models and encodings survive between runs."""
+
+    def __init__(self):
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def _start_worker(self, module_name):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        # Not daemonic: modules start their own process pools (facial encoders, ai training),
+        # which daemonic processes are not allowed to do.
+        process = multiprocessing.Process(target=_worker_main, args=(module_name, child_conn),
+                                          name=f"osintel-{module_name}", daemon=False)
+        process.start()
+        child_conn.close()
+        # Workers are not daemonic, so stop them at exit. Re-registered after every start so it runs
+        # before multiprocessing's own exit handler, which would otherwise wait on the idle workers forever.
+        atexit.unregister(self.shutdown)
+        atexit.register(self.shutdown)
+
+        ready = parent_conn.recv()
+        if ready["status"] != "ready":
+            process.join()
+            raise RuntimeError(f"Worker for {module_name} failed to start: {ready['error']}")
+
+        self._workers[module_name] = (process, parent_conn, threading.Lock())
+        return ready["warm_up_seconds"]
+
+    def ensure_worker(self, module_name):
+        """Starts (or restarts a dead) worker for a module and returns its warm-up time, or None if already warm."""
+        with self._lock:
+            worker = self._workers.get(module_name)
+            if worker is not None and worker[0].is_alive():
+                return None
+            return self._start_worker(module_name)
+
+    def submit(self, module_name, job_args):
+        """Runs `module.run_job(**job_args)` in the module's warm worker and returns its response."""
+        self.ensure_worker(module_name)
+        process, conn, worker_lock = self._workers[module_name]
+        with worker_lock:
+            try:
+                conn.send(job_args)
+                return conn.recv()
+            except (EOFError, BrokenPipeError) as e:
+                return {"status": "error", "error": f"Worker for {module_name} died: {e}"}
+
+    def shutdown(self):
+        """Stops all worker processes."""
+        with self._lock:
+            for module_name, (process, conn, _) in self._workers.items():
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                conn.close()
+            self._workers = {}